@@ -1,35 +1,66 @@
 import sys
 import os
 import time
-import urllib.request
+import threading
+import queue
+from collections import Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List
-from dataclasses import dataclass
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
 import json
+import logging
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
-    QLabel, QLineEdit, QPushButton, QTextEdit, QProgressBar,
-    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget,
+    QLabel, QLineEdit, QPushButton, QTextEdit, QPlainTextEdit, QProgressBar,
+    QTableView, QAbstractItemView, QHeaderView, QTabWidget,
     QGroupBox, QSpinBox, QFileDialog,
     QMessageBox, QStyledItemDelegate, QStyleOptionViewItem
 )
 from PyQt6.QtCore import (
-    pyqtSignal, Qt, QSettings, QRect,
-    QThreadPool, QRunnable, QObject
+    pyqtSignal, Qt, QSettings, QRect, QTimer,
+    QEvent, QThread, QThreadPool, QRunnable, QObject, QAbstractTableModel, QModelIndex
 )
-from PyQt6.QtGui import QColor, QPainter, QIcon
-from urllib.parse import urljoin
+from PyQt6.QtGui import QBrush, QColor, QPainter, QIcon, QFont, QPixmap, QPixmapCache, QTextCursor
+from urllib.parse import quote
+import requests
 from ui.components.tree_file_selection_dialog import HuggingfaceFileDialog
+try:
+    import orjson  # 可选依赖，序列化任务列表更快
+except ImportError:
+    orjson = None
+
+from net.session import get_shared_session
 from ui.proxy_config_widget import ProxyConfigWidget
 from ui.utils import set_black_ui
-from huggingface_hub import hf_hub_download
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ICON_PATH = os.path.join(BASE_DIR, "icon.png")
 
-
-@dataclass
+# 下载时每累计写入这么多字节更新一次进度
+PROGRESS_UPDATE_BYTES = 1 << 20
+# 日志框保留的最大行数
+LOG_MAX_LINES = 500
+# 网络读取与磁盘写入之间最多缓冲的块数
+WRITE_QUEUE_SIZE = 8
+# 分段并发下载：每段至少 16MB，单个文件最多 8 段
+PARALLEL_MIN_PART_SIZE = 16 * 1024 * 1024
+PARALLEL_MAX_PARTS = 8
+# 下载中的数据先写入 .incomplete 文件（预分配到完整大小，内容不可信），
+# 正常中断时截断到已写入的有效前缀并改名为 .part 供续传，完成后才改名为目标文件
+ACTIVE_SUFFIX = ".incomplete"
+PARTIAL_SUFFIX = ".part"
+# 平均文件小于该大小时视为小文件任务，提高并发数以掩盖请求延迟
+SMALL_FILE_SIZE = 5 * 1024 * 1024
+SMALL_FILE_MAX_WORKERS = 16
+
+
+@dataclass(slots=True)
 class DownloadTask:
     repo_id: str
     filename: str
@@ -41,10 +72,196 @@ class DownloadTask:
     downloaded: int = 0
     speed: str = "0 B/s"
     task_id: str = ""
+    etag: str = ""  # 服务器返回的 ETag，用于判断本地文件是否与远端一致
+    file_url: str = field(init=False, default="", repr=False)
+    local_path: str = field(init=False, default="", repr=False)  # 保存目录 local_dir/repo_id
+    # 格式化后的大小文本缓存 (原始值, 文本)，只在数值变化时重新格式化
+    _size_text: tuple = field(init=False, default=(0, "--"), repr=False, compare=False)
+    _downloaded_text: tuple = field(init=False, default=(0, "--"), repr=False, compare=False)
 
     def __post_init__(self):
         if not self.task_id:
             self.task_id = f"{self.repo_id}:{self.filename}"
+        # 下载地址和保存目录在任务生命周期内不变，创建时生成一次
+        self.local_path = os.path.join(self.local_dir, self.repo_id)
+        self.file_url = (f"https://huggingface.co/{self.repo_id}/resolve/{quote(self.revision, safe='')}/"
+                         f"{quote(self.filename, safe='/')}")
+
+    @property
+    def size_text(self) -> str:
+        """总大小的显示文本"""
+        value, text = self._size_text
+        if value != self.size:
+            text = format_size(self.size) if self.size > 0 else "--"
+            self._size_text = (self.size, text)
+        return text
+
+    @property
+    def downloaded_text(self) -> str:
+        """已下载大小的显示文本"""
+        value, text = self._downloaded_text
+        if value != self.downloaded:
+            text = format_size(self.downloaded) if self.downloaded > 0 else "--"
+            self._downloaded_text = (self.downloaded, text)
+        return text
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
+def format_size(size_bytes: int) -> str:
+    """格式化文件大小"""
+    if size_bytes <= 0:
+        return "0 B"
+
+    # 由二进制位数直接确定单位，每 10 位进一级
+    unit = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}"
+
+
+# 各任务状态对应的颜色 (RGB)，表格状态列和进度条共用
+STATUS_COLORS = {
+    "已完成": (76, 175, 80),  # 绿色
+    "失败": (244, 67, 54),  # 红色
+    "下载中": (33, 150, 243),  # 蓝色
+    "暂停": (255, 152, 0),  # 橙色
+}
+
+
+class TaskTableModel(QAbstractTableModel):
+    """下载任务表格模型"""
+
+    HEADERS = ["仓库", "文件名", "状态", "进度", "已下载", "总大小", "速度", "保存路径"]
+
+    # 直接显示任务字段的列
+    _COLUMN_ATTRS = {0: "repo_id", 1: "filename", 2: "status", 6: "speed"}
+
+    # 任务状态/进度变化只影响这些角色，通知视图时带上以免重新查询其他角色
+    _CHANGED_ROLES = [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.UserRole]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks: List[DownloadTask] = []
+        self._rows: Dict[str, int] = {}  # task_id -> 行号
+        self._shown: Dict[str, tuple] = {}  # task_id -> 上次通知视图时第 2~6 列的取值
+        # 状态列文字颜色，返回 QBrush 避免每次绘制时由 QColor 转换
+        self._status_brushes = {status: QBrush(QColor(*rgb)) for status, rgb in STATUS_COLORS.items()}
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        task = self._tasks[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            attr = self._COLUMN_ATTRS.get(column)
+            if attr is not None:
+                return getattr(task, attr)
+            if column == 4:
+                return task.downloaded_text
+            if column == 5:
+                return task.size_text
+            if column == 7:
+                return task.local_path
+        elif role == Qt.ItemDataRole.UserRole and column == 3:
+            # 进度列没有显示文本，由进度条委托根据 (进度, 状态) 绘制
+            return task.progress, task.status
+        elif role == Qt.ItemDataRole.ForegroundRole and column == 2:
+            return self._status_brushes.get(task.status)
+
+        return None
+
+    def set_tasks(self, tasks: List[DownloadTask]):
+        """重置全部任务"""
+        self.beginResetModel()
+        self._tasks = list(tasks)
+        self._rows = {task.task_id: row for row, task in enumerate(self._tasks)}
+        self._shown.clear()
+        self.endResetModel()
+
+    def add_tasks(self, tasks: List[DownloadTask]):
+        """追加任务，已存在的任务原地替换"""
+        new_tasks: Dict[str, DownloadTask] = {}
+        for task in tasks:
+            row = self._rows.get(task.task_id)
+            if row is None:
+                new_tasks[task.task_id] = task
+            else:
+                self._tasks[row] = task
+                self._shown.pop(task.task_id, None)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+        if not new_tasks:
+            return
+
+        first = len(self._tasks)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_tasks) - 1)
+        self._tasks.extend(new_tasks.values())
+        for row, task in enumerate(new_tasks.values(), first):
+            self._rows[task.task_id] = row
+        self.endInsertRows()
+
+    def remove_rows(self, rows: List[int]):
+        """移除指定的行，连续的行合并为一次删除"""
+        ranges = []
+        for row in sorted(set(rows), reverse=True):
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1][0] = row
+            else:
+                ranges.append([row, row])
+
+        # 从后往前删，前面的行号不受影响
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._tasks[first:last + 1]
+            self.endRemoveRows()
+        self._rows = {task.task_id: row for row, task in enumerate(self._tasks)}
+        self._shown = {task_id: values for task_id, values in self._shown.items() if task_id in self._rows}
+
+    def task_id_at(self, row: int) -> str:
+        """获取指定行的任务ID"""
+        return self._tasks[row].task_id
+
+    @staticmethod
+    def _shown_values(task: DownloadTask) -> tuple:
+        """第 2~6 列显示所依赖的值，进度条按 0.1% 精度和状态绘制"""
+        return (task.status, (round(task.progress * 10), task.status),
+                task.downloaded, task.size, task.speed)
+
+    def task_updated(self, task_id: str):
+        """通知某个任务的状态/进度发生变化，只刷新取值变化的列"""
+        row = self._rows.get(task_id)
+        if row is None:
+            return
+
+        values = self._shown_values(self._tasks[row])
+        old_values = self._shown.get(task_id)
+        self._shown[task_id] = values
+        if old_values is None:
+            self.dataChanged.emit(self.index(row, 2), self.index(row, 6), self._CHANGED_ROLES)
+            return
+
+        changed = [column for column, (old, new) in enumerate(zip(old_values, values), 2) if old != new]
+        if changed:
+            self.dataChanged.emit(self.index(row, changed[0]), self.index(row, changed[-1]), self._CHANGED_ROLES)
+
+    def refresh(self):
+        """通知所有行的数据发生变化（行数不变）"""
+        self._shown.clear()
+        if self._tasks:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._tasks) - 1, len(self.HEADERS) - 1))
 
 
 class ProgressItemDelegate(QStyledItemDelegate):
@@ -52,58 +269,129 @@ class ProgressItemDelegate(QStyledItemDelegate):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 绘制用的颜色和字体只创建一次，避免每次 paint 重新分配
+        self._bg_color = QColor(45, 45, 45)
+        self._border_color = QColor(80, 80, 80)
+        self._text_color = QColor(255, 255, 255)
+        self._status_colors = {status: QColor(*rgb) for status, rgb in STATUS_COLORS.items()}
+        self._default_color = QColor(96, 125, 139)  # 灰色
+        self._font = QFont()
+        self._font.setPointSize(9)
 
     def paint(self, painter: QPainter, option: QStyleOptionViewItem, index):
         if index.column() == 3:  # 进度列
+            if not option.rect.isValid():
+                return
+
             progress_data = index.data(Qt.ItemDataRole.UserRole)
             if progress_data is not None:
-                progress_value = float(progress_data)
-
-                # 绘制进度条背景
-                bg_rect = QRect(option.rect)
-                bg_rect.adjust(2, 2, -2, -2)  # 添加边距
-                painter.fillRect(bg_rect, QColor(45, 45, 45))
-
-                # 绘制进度条
-                if progress_value > 0:
-                    progress_rect = QRect(bg_rect)
-                    progress_rect.setWidth(int(bg_rect.width() * progress_value / 100))
-
-                    # 根据状态选择颜色
-                    status = index.model().data(index.siblingAtColumn(2), Qt.ItemDataRole.DisplayRole)
-                    if status == "已完成":
-                        color = QColor(76, 175, 80)  # 绿色
-                    elif status == "失败":
-                        color = QColor(244, 67, 54)  # 红色
-                    elif status == "下载中":
-                        color = QColor(33, 150, 243)  # 蓝色
-                    elif status == "暂停":
-                        color = QColor(255, 152, 0)  # 橙色
-                    else:
-                        color = QColor(96, 125, 139)  # 灰色
+                # 进度单元格直接保存 (进度, 状态)，无需再查询状态列
+                progress_value, status = progress_data
+                # 进度精确到 0.1%，相同进度、状态和尺寸的单元格复用缓存的图像
+                tenths = round(progress_value * 10)
+                dpr = painter.device().devicePixelRatioF()
+                size = option.rect.size()
+                key = f"p{tenths}_{status}_{size.width()}x{size.height()}@{dpr}"
+
+                pixmap = QPixmapCache.find(key)
+                if pixmap is None:
+                    pixmap = self._render_progress(size, dpr, tenths, status)
+                    QPixmapCache.insert(key, pixmap)
+
+                painter.drawPixmap(option.rect.topLeft(), pixmap)
+                return
 
-                    painter.fillRect(progress_rect, color)
+        super().paint(painter, option, index)
 
-                # 绘制边框
-                painter.setPen(QColor(80, 80, 80))
-                painter.drawRect(bg_rect)
+    def _render_progress(self, size, dpr: float, tenths: int, status: str) -> QPixmap:
+        """将进度条绘制到离屏图像"""
+        pixmap = QPixmap(size * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
 
-                # 绘制文本
-                painter.setPen(QColor(255, 255, 255))
-                font = painter.font()
-                font.setPointSize(9)
-                painter.setFont(font)
-                painter.drawText(bg_rect, Qt.AlignmentFlag.AlignCenter, f"{progress_value:.1f}%")
-                return
+        painter = QPainter(pixmap)
 
-        super().paint(painter, option, index)
+        # 绘制进度条背景
+        bg_rect = QRect(0, 0, size.width(), size.height())
+        bg_rect.adjust(2, 2, -2, -2)  # 添加边距
+        painter.fillRect(bg_rect, self._bg_color)
+
+        # 绘制进度条
+        if tenths > 0:
+            progress_rect = QRect(bg_rect)
+            progress_rect.setWidth(int(bg_rect.width() * tenths / 1000))
+            # 根据状态选择颜色
+            painter.fillRect(progress_rect, self._status_colors.get(status, self._default_color))
+
+        # 绘制边框
+        painter.setPen(self._border_color)
+        painter.drawRect(bg_rect)
+
+        # 绘制文本
+        painter.setPen(self._text_color)
+        painter.setFont(self._font)
+        painter.drawText(bg_rect, Qt.AlignmentFlag.AlignCenter, f"{tenths / 10:.1f}%")
+
+        painter.end()
+        return pixmap
+
+
+class IncompleteDownloadError(IOError):
+    """数据流提前结束或区间长度不符，已下载部分保留为 .part 供续传"""
 
 
 class DownloadWorkerSignals(QObject):
-    """下载线程信号"""
-    progress_updated = pyqtSignal(str, float, str, str, int, int)  # task_id, progress, speed, status, downloaded, total
+    """下载线程信号
+
+    各下载线程的进度先写入待刷新字典，由主线程每 50ms 合并为一次 batch_updated 发出
+    """
+    batch_updated = pyqtSignal(list)  # [(task_id, progress, speed, status, downloaded, total), ...]
     task_completed = pyqtSignal(str, bool, str)  # task_id, success, message
     task_started = pyqtSignal(str)  # task_id
+    _wake = pyqtSignal()  # 待刷新字典由空变为非空时通知主线程
+
+    FLUSH_INTERVAL_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending: Dict[str, tuple] = {}
+        self._pending_lock = threading.Lock()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._wake.connect(self._on_wake)
+
+        # 任务结束前先刷新该任务最后的进度，保证完成回调看到的是最终状态
+        self.task_completed.connect(self.flush)
+
+    def report_progress(self, task_id: str, progress: float, speed: str, status: str,
+                        downloaded: int, total: int):
+        """记录任务进度（可在任意线程调用），同一任务只保留最新一次"""
+        with self._pending_lock:
+            wake = not self._pending
+            self._pending[task_id] = (task_id, progress, speed, status, downloaded, total)
+        if wake:
+            self._wake.emit()
+
+    def _on_wake(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """发出所有待刷新的进度"""
+        with self._pending_lock:
+            if not self._pending:
+                return
+            updates = list(self._pending.values())
+            self._pending.clear()
+        self.batch_updated.emit(updates)
+
+    def discard_pending(self):
+        """丢弃尚未发出的进度（暂停时使用）"""
+        with self._pending_lock:
+            self._pending.clear()
 
 
 class SingleDownloadWorker(QRunnable):
@@ -120,7 +408,8 @@ class SingleDownloadWorker(QRunnable):
         self._start_time = None
         self._last_update_time = None
         self._last_downloaded = 0
-        self._speed_samples = []  # 用于平滑速度计算
+        self._speed_samples = deque(maxlen=5)  # 最近5个样本，用于平滑速度计算
+        self._speed_sum = 0.0  # 样本的累计和
 
     def run(self):
         # 在开始执行前检查是否已被取消
@@ -140,18 +429,24 @@ class SingleDownloadWorker(QRunnable):
             # 检查本地文件是否已存在并获取已下载大小
             local_file_path = self.get_local_file_path()
             initial_downloaded = 0
-            if local_file_path.exists():
+            file_exists = local_file_path.exists()
+            if file_exists:
                 initial_downloaded = local_file_path.stat().st_size
                 self.task.downloaded = initial_downloaded
+            else:
+                part_size = _local_file_size(str(local_file_path) + PARTIAL_SUFFIX)
+                if part_size is not None:
+                    initial_downloaded = part_size
+                    self.task.downloaded = initial_downloaded
 
             # 初始化速度计算参数
-            self._start_time = time.time()
+            self._start_time = time.monotonic()
             self._last_update_time = self._start_time
             self._last_downloaded = initial_downloaded
 
-            # 如果文件已完成，直接返回
-            if self.task.size > 0 and initial_downloaded >= self.task.size:
-                self.signals.progress_updated.emit(
+            # 如果文件已完成，直接返回（目标文件只在下载完成后才会生成）
+            if file_exists and self.task.size > 0 and initial_downloaded >= self.task.size:
+                self.signals.report_progress(
                     self.task.task_id, 100.0, "已完成", "已完成", initial_downloaded, self.task.size
                 )
                 self.signals.task_completed.emit(
@@ -162,11 +457,11 @@ class SingleDownloadWorker(QRunnable):
             # 发送初始进度（不归零已下载的进度）
             if self.task.size > 0 and initial_downloaded > 0:
                 initial_progress = (initial_downloaded / self.task.size) * 100
-                self.signals.progress_updated.emit(
+                self.signals.report_progress(
                     self.task.task_id, initial_progress, "准备中", "下载中", initial_downloaded, self.task.size
                 )
             else:
-                self.signals.progress_updated.emit(
+                self.signals.report_progress(
                     self.task.task_id, 0, "准备中", "下载中", initial_downloaded, 0
                 )
 
@@ -178,7 +473,7 @@ class SingleDownloadWorker(QRunnable):
                 if total > 0:
                     progress = (downloaded / total) * 100
                     speed = self.calculate_speed(downloaded)
-                    self.signals.progress_updated.emit(
+                    self.signals.report_progress(
                         self.task.task_id, progress, speed, "下载中", downloaded, total
                     )
                 return True
@@ -189,7 +484,7 @@ class SingleDownloadWorker(QRunnable):
             if not self.is_cancelled:
                 # 获取最终文件大小
                 final_size = local_file_path.stat().st_size if local_file_path.exists() else 0
-                self.signals.progress_updated.emit(
+                self.signals.report_progress(
                     self.task.task_id, 100, "完成", "已完成", final_size, final_size
                 )
                 self.signals.task_completed.emit(
@@ -197,7 +492,7 @@ class SingleDownloadWorker(QRunnable):
                 )
 
         except Exception as e:
-            self.signals.progress_updated.emit(
+            self.signals.report_progress(
                 self.task.task_id, self.task.progress, "错误", "失败", self.task.downloaded, self.task.size
             )
             self.signals.task_completed.emit(
@@ -206,98 +501,91 @@ class SingleDownloadWorker(QRunnable):
 
     def get_local_file_path(self) -> Path:
         """获取本地文件路径"""
-        local_dir = Path(self.task.local_dir) / self.task.repo_id
-        return local_dir / self.task.filename
+        return Path(self.task.local_path) / self.task.filename
 
     def download_with_progress(self, progress_callback):
         """带进度回调的下载函数 - 优化版"""
         try:
-            # 构建下载URL
-            base_url = f"https://huggingface.co/{self.task.repo_id}/resolve/{self.task.revision}/"
-            file_url = urljoin(base_url, self.task.filename)
+            file_url = self.task.file_url
             
             # 如果有token，添加到请求头中
             headers = {}
             if self.token:
                 headers['Authorization'] = f'Bearer {self.token}'
-                print(f"使用token进行认证: {self.token[:5]}...{self.token[-5:] if len(self.token) > 10 else ''}")
+                logger.debug("使用token进行认证: %s...", self.token[:5])
             else:
-                print("未使用token进行认证")
+                logger.debug("未使用token进行认证")
 
             # 创建本地目录
             local_file_path = self.get_local_file_path()
             local_file_path.parent.mkdir(parents=True, exist_ok=True)
+            work_path = local_file_path.with_name(local_file_path.name + ACTIVE_SUFFIX)
+            part_path = local_file_path.with_name(local_file_path.name + PARTIAL_SUFFIX)
 
-            # 检查是否需要断点续传
-            resume_byte_pos = 0
-            if local_file_path.exists():
-                resume_byte_pos = local_file_path.stat().st_size
+            # 要求原始字节流，保证 Range 偏移与本地文件一致
+            headers['Accept-Encoding'] = 'identity'
 
-            # 创建请求
-            # 创建基本请求对象
-            req = urllib.request.Request(file_url)
-            
-            # 添加所有头部信息
-            for header, value in headers.items():
-                req.add_header(header, value)
-                
-            # 如果需要断点续传，添加Range头
-            if resume_byte_pos > 0:
-                req.add_header('Range', f'bytes={resume_byte_pos}-')
-                
-            # 打印请求头信息，用于调试
-            print(f"请求URL: {file_url}")
-            print(f"请求头: {req.headers}")
-            if 'Authorization' in req.headers:
-                print("已包含Authorization头")
-            else:
-                print("未包含Authorization头")
-
-            # 发送请求
-            with urllib.request.urlopen(req) as response:
-                # 获取文件总大小
-                content_length = response.headers.get('content-length')
-                if content_length:
-                    if resume_byte_pos > 0:
-                        total_size = int(content_length) + resume_byte_pos
-                    else:
-                        total_size = int(content_length)
-                else:
-                    total_size = 0
+            # 所有下载线程共享同一会话，复用 keep-alive 连接
+            session = get_shared_session()
 
-                downloaded = resume_byte_pos
+            total_size, etag, accept_ranges = self._probe_remote_file(session, file_url, headers)
 
-                # 打开本地文件
-                mode = 'ab' if resume_byte_pos > 0 else 'wb'
-                with open(local_file_path, mode) as f:
-                    while True:
-                        if self.is_cancelled:
-                            break
-
-                        chunk = response.read(8192)
-                        if not chunk:
-                            break
+            # 目标文件只在下载完成后生成，与远端一致时无需再下载
+            if local_file_path.exists() and 0 < total_size == local_file_path.stat().st_size:
+                if not etag or not self.task.etag or self.task.etag == etag:
+                    self.task.etag = etag or self.task.etag
+                    return str(local_file_path)
 
-                        f.write(chunk)
-                        downloaded += len(chunk)
+            # 检查是否需要断点续传：只信任正常中断时留下的 .part 文件，
+            # 异常退出遗留的 .incomplete 文件可能含有预分配的空洞，直接丢弃
+            resume_byte_pos = 0
+            if part_path.exists():
+                os.replace(part_path, work_path)
+                resume_byte_pos = work_path.stat().st_size
+            elif work_path.exists():
+                work_path.unlink()
+
+            if etag:
+                if self.task.etag and self.task.etag != etag:
+                    # 远端文件已变化，已下载的部分作废
+                    resume_byte_pos = 0
+                self.task.etag = etag
+
+            # 大文件切分为多个区间并发下载
+            parts = 1
+            if accept_ranges:
+                remaining = total_size - resume_byte_pos
+                parts = min(PARALLEL_MAX_PARTS, max(1, remaining // PARALLEL_MIN_PART_SIZE))
+            completed = False
+            try:
+                if parts > 1:
+                    completed = self._download_parallel(session, file_url, headers, work_path,
+                                                        resume_byte_pos, total_size, parts,
+                                                        progress_callback)
+                else:
+                    # 发送请求（复用共享会话的连接池，避免每个文件重新握手）
+                    completed = self._download_stream(session, file_url, headers, work_path,
+                                                      resume_byte_pos, progress_callback)
+            finally:
+                self._finish_work_file(work_path, part_path, local_file_path, completed)
 
-                        # 调用进度回调（限制更新频率）
-                        current_time = time.time()
-                        if current_time - self._last_update_time >= 0.1:  # 每100ms更新一次
-                            if not progress_callback(downloaded, total_size):
-                                break
-                            self._last_update_time = current_time
+            # 未被取消却没有下载完整时不能当作成功，否则任务被标记为已完成而 .part 文件无人续传
+            if not completed and not self.is_cancelled:
+                raise IncompleteDownloadError("下载不完整，已保留已下载部分，可重新开始续传")
 
             return str(local_file_path)
 
+        except IncompleteDownloadError:
+            raise
+
         except Exception as e:
             # fallback到原始方法，添加token支持
-            print(f"使用fallback方法下载: {self.task.filename}")
-            if self.token:
-                print(f"fallback方法使用token进行认证: {self.token[:5]}...{self.token[-5:] if len(self.token) > 10 else ''}")
-            else:
-                print("fallback方法未使用token进行认证")
-                
+            logger.info("使用fallback方法下载: %s (%s)", self.task.filename, e)
+            logger.debug("fallback方法%s使用token进行认证", "" if self.token else "未")
+
+            # huggingface_hub 导入较慢，只在 fallback 时加载
+            from huggingface_hub import hf_hub_download
+
             return hf_hub_download(
                 repo_id=self.task.repo_id,
                 filename=self.task.filename,
@@ -307,9 +595,193 @@ class SingleDownloadWorker(QRunnable):
                 token=self.token  # 使用token进行认证
             )
 
+    def _download_stream(self, session: requests.Session, file_url: str, headers: Dict,
+                         work_path: Path, resume_byte_pos: int, progress_callback):
+        """单连接流式下载到工作文件，中途停止时截掉预分配的部分，返回是否完整下载"""
+        # 如果需要断点续传，添加Range头
+        if resume_byte_pos > 0:
+            headers['Range'] = f'bytes={resume_byte_pos}-'
+
+        # 调试信息（不输出包含 token 的完整请求头）
+        logger.debug("请求URL: %s, Range: %s, Authorization: %s",
+                     file_url, headers.get('Range'), 'Authorization' in headers)
+
+        with session.get(file_url, headers=headers, stream=True, timeout=(10, 60)) as response:
+            response.raise_for_status()
+
+            # 服务器未按 Range 返回部分内容时，从头重新下载
+            if resume_byte_pos > 0 and response.status_code != 206:
+                resume_byte_pos = 0
+
+            # 获取文件总大小
+            content_length = response.headers.get('content-length')
+            if content_length:
+                if resume_byte_pos > 0:
+                    total_size = int(content_length) + resume_byte_pos
+                else:
+                    total_size = int(content_length)
+            else:
+                total_size = 0
+
+            downloaded = resume_byte_pos
+
+            # 根据文件大小自适应读取块大小（64KB ~ 1MB），减少 read/write 调用次数
+            read_size = max(65536, min(1 << 20, total_size // 1024 or 1 << 20))
+            bytes_since_update = 0
+
+            # 打开本地文件（预分配后不能用追加模式，续传时定位到已下载的末尾）
+            mode = 'r+b' if resume_byte_pos > 0 else 'wb'
+            with open(work_path, mode, buffering=1 << 20) as f:
+                f.seek(resume_byte_pos)
+                if total_size > downloaded:
+                    self._preallocate(f, total_size)
+
+                # 写盘放到独立线程，网络读取不必等待磁盘写入完成
+                write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+                written = resume_byte_pos
+                write_errors = []
+
+                def writer():
+                    nonlocal written
+                    while True:
+                        chunk = write_queue.get()
+                        if chunk is None:
+                            return
+                        if write_errors:
+                            continue  # 出错后只消费队列，避免读取端阻塞
+                        try:
+                            f.write(chunk)
+                            written += len(chunk)
+                        except OSError as e:
+                            write_errors.append(e)
+
+                writer_thread = threading.Thread(target=writer, daemon=True)
+                writer_thread.start()
+                try:
+                    for chunk in response.iter_content(chunk_size=read_size):
+                        if self.is_cancelled or write_errors:
+                            break
+
+                        write_queue.put(chunk)
+                        downloaded += len(chunk)
+
+                        # 按已读取字节数限制进度更新频率，循环内不再读取时间
+                        bytes_since_update += len(chunk)
+                        if bytes_since_update >= PROGRESS_UPDATE_BYTES:
+                            bytes_since_update = 0
+                            if not progress_callback(downloaded, total_size):
+                                break
+                finally:
+                    write_queue.put(None)
+                    writer_thread.join()
+                    # 未下载完整时截掉预分配的部分，断点续传依赖文件大小判断进度
+                    if written < total_size:
+                        f.truncate(written)
+
+                if write_errors:
+                    raise write_errors[0]
+
+            # 服务器未告知大小时，以数据流正常结束为准
+            return not self.is_cancelled and (total_size <= 0 or written == total_size)
+
+    @staticmethod
+    def _finish_work_file(work_path: Path, part_path: Path, local_file_path: Path, completed: bool):
+        """下载结束后处理工作文件：完成时改名为目标文件，否则留作 .part 供续传"""
+        if not work_path.exists():
+            return
+        os.replace(work_path, local_file_path if completed else part_path)
+
+    def _probe_remote_file(self, session: requests.Session, file_url: str, headers: Dict):
+        """通过 HEAD 请求获取远端文件信息，返回 (文件总大小, ETag, 是否支持分段)"""
+        try:
+            head = session.head(file_url, headers=headers, allow_redirects=True, timeout=(10, 30))
+            head.raise_for_status()
+            total_size = int(head.headers.get('content-length', 0))
+        except (requests.RequestException, ValueError):
+            return 0, "", False
+
+        etag = head.headers.get('etag', '')
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        accept_ranges = head.headers.get('accept-ranges', '').lower() == 'bytes'
+        return total_size, etag.strip('"'), accept_ranges
+
+    def _download_parallel(self, session: requests.Session, file_url: str, headers: Dict,
+                           local_file_path: Path, resume_byte_pos: int, total_size: int,
+                           parts: int, progress_callback):
+        """分段并发下载：每个区间独立请求并写入工作文件的对应偏移，返回是否全部区间下载完成
+
+        工作文件会预分配到完整大小，异常退出时其内容不可信；只有全部区间完成后
+        才由调用方改名为目标文件，正常中断时截断到连续前缀供续传。
+        """
+        part_size = -(-(total_size - resume_byte_pos) // parts)
+        ranges = [(start, min(start + part_size, total_size))
+                  for start in range(resume_byte_pos, total_size, part_size)]
+        written = [0] * len(ranges)  # 每个区间已写入的字节数，只由对应线程修改
+        stop = threading.Event()
+
+        # 预先将文件扩展到完整大小，各线程直接写入各自的偏移
+        with open(local_file_path, 'r+b' if resume_byte_pos > 0 else 'wb') as f:
+            self._preallocate(f, total_size)
+
+        def fetch(index: int):
+            start, end = ranges[index]
+            range_headers = dict(headers, Range=f'bytes={start}-{end - 1}')
+            with session.get(file_url, headers=range_headers, stream=True, timeout=(10, 60)) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise IOError(f"服务器不支持分段下载: HTTP {response.status_code}")
+                with open(local_file_path, 'r+b', buffering=1 << 20) as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        if self.is_cancelled or stop.is_set():
+                            return
+                        # 超出区间的数据会覆盖下一区间，不写入并按下载不完整处理
+                        if written[index] + len(chunk) > end - start:
+                            raise IncompleteDownloadError(f"分段 {start}-{end - 1} 返回的数据超出请求范围")
+                        f.write(chunk)
+                        written[index] += len(chunk)
+
+        error = None
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            pending = {executor.submit(fetch, i) for i in range(len(ranges))}
+            while pending:
+                finished, pending = wait(pending, timeout=0.1)
+                for future in finished:
+                    if future.exception() is not None and error is None:
+                        error = future.exception()
+                        stop.set()
+                if not stop.is_set() and not self.is_cancelled:
+                    if not progress_callback(resume_byte_pos + sum(written), total_size):
+                        stop.set()
+
+        # 未全部完成时截断到连续已下载的前缀，保证断点续传按文件大小继续时数据正确
+        for (start, end), count in zip(ranges, written):
+            if start + count < end:
+                with open(local_file_path, 'r+b') as f:
+                    f.truncate(start + count)
+                break
+
+        if error is not None:
+            raise error
+
+        return not (self.is_cancelled or stop.is_set()) and all(
+            start + count == end for (start, end), count in zip(ranges, written))
+
+    @staticmethod
+    def _preallocate(f, size: int):
+        """预分配文件空间，减少写入过程中的碎片和元数据更新"""
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+                return
+            except OSError:
+                pass  # 文件系统不支持时退回 truncate
+        f.truncate(size)
+
     def calculate_speed(self, downloaded: int) -> str:
         """计算下载速度 - 优化版，使用滑动平均"""
-        current_time = time.time()
+        current_time = time.monotonic()
 
         if self._last_update_time is None:
             self._last_update_time = current_time
@@ -324,13 +796,14 @@ class SingleDownloadWorker(QRunnable):
         bytes_diff = downloaded - self._last_downloaded
         current_speed = bytes_diff / time_diff
 
-        # 添加到样本中用于平滑处理
+        # 添加到样本中用于平滑处理，队列满时最旧的样本被挤出
+        if len(self._speed_samples) == self._speed_samples.maxlen:
+            self._speed_sum -= self._speed_samples[0]
         self._speed_samples.append(current_speed)
-        if len(self._speed_samples) > 5:  # 保留最近5个样本
-            self._speed_samples.pop(0)
+        self._speed_sum += current_speed
 
         # 计算平滑速度
-        smooth_speed = sum(self._speed_samples) / len(self._speed_samples)
+        smooth_speed = self._speed_sum / len(self._speed_samples)
 
         self._last_update_time = current_time
         self._last_downloaded = downloaded
@@ -339,24 +812,39 @@ class SingleDownloadWorker(QRunnable):
 
     def format_speed(self, speed_bps: float) -> str:
         """格式化速度"""
-        for unit in ['B/s', 'KB/s', 'MB/s', 'GB/s']:
-            if speed_bps < 1024.0:
-                return f"{speed_bps:.1f} {unit}"
-            speed_bps /= 1024.0
-        return f"{speed_bps:.1f} TB/s"
+        if speed_bps < 1024.0:
+            return f"{speed_bps:.1f} B/s"
+        # 平滑后的速度变化缓慢，按 KB 取整后复用已格式化的字符串
+        return self._format_speed_kib(int(speed_bps) >> 10)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _format_speed_kib(speed_kib: int) -> str:
+        speed = float(speed_kib)
+        for unit in ['KB/s', 'MB/s', 'GB/s']:
+            if speed < 1024.0:
+                return f"{speed:.1f} {unit}"
+            speed /= 1024.0
+        return f"{speed:.1f} TB/s"
 
     def cancel(self):
         self.is_cancelled = True
 
 
+def max_worker_limit() -> int:
+    """并发下载数上限：为界面线程和后台保存线程预留两个核心"""
+    return max(2, QThread.idealThreadCount() - 2)
+
+
 class MultiThreadDownloadManager(QObject):
     """多线程下载管理器"""
     all_completed = pyqtSignal()
 
     def __init__(self, max_workers: int = 3):
         super().__init__()
+        self.max_workers = min(max_workers, max_worker_limit())  # 用户设置的并发数
         self.thread_pool = QThreadPool()
-        self.thread_pool.setMaxThreadCount(max_workers)
+        self.thread_pool.setMaxThreadCount(self.max_workers)
         self.signals = DownloadWorkerSignals()
         self.active_workers: Dict[str, SingleDownloadWorker] = {}
         self.completed_tasks = 0
@@ -374,12 +862,34 @@ class MultiThreadDownloadManager(QObject):
         self.is_downloading = True
         self._is_cancelled = False  # 重置取消标志
 
+        self.thread_pool.setMaxThreadCount(self.plan_worker_count(tasks))
+
         for task in tasks:
             worker = SingleDownloadWorker(task, proxy_config, self.signals, token)
             worker.manager = self  # 让worker能够访问manager
             self.active_workers[task.task_id] = worker
             self.thread_pool.start(worker)
 
+    def set_max_workers(self, value: int) -> int:
+        """设置并发下载数，返回实际生效的值"""
+        self.max_workers = min(value, max_worker_limit())
+        self.thread_pool.setMaxThreadCount(self.max_workers)
+        return self.max_workers
+
+    def plan_worker_count(self, tasks: List[DownloadTask]) -> int:
+        """根据文件数量和大小确定并发数
+
+        大量小文件时提高并发；大文件已按区间并发下载，减少同时下载的文件数
+        """
+        sizes = [task.size for task in tasks if task.size > 0]
+        if not sizes:
+            workers = self.max_workers
+        elif sum(sizes) / len(sizes) < SMALL_FILE_SIZE:
+            workers = max(self.max_workers, min(SMALL_FILE_MAX_WORKERS, len(tasks)))
+        else:
+            workers = min(self.max_workers, max(2, (os.cpu_count() or 4) // 2))
+        return max(1, min(workers, len(tasks), max_worker_limit()))
+
     def _on_task_completed(self, task_id: str, success: bool, message: str):
         """任务完成处理"""
         self.completed_tasks += 1
@@ -405,6 +915,7 @@ class MultiThreadDownloadManager(QObject):
         # 等待当前正在执行的任务完成
         self.thread_pool.waitForDone(3000)
         self.active_workers.clear()
+        self.signals.discard_pending()
 
     def is_cancelled(self) -> bool:
         """检查是否已取消"""
@@ -415,12 +926,123 @@ class MultiThreadDownloadManager(QObject):
         return self.is_downloading and len(self.active_workers) > 0
 
 
+def _local_file_size(path: str) -> Optional[int]:
+    """获取本地文件大小，文件不存在时返回 None"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _local_download_state(path: str):
+    """本地下载进度：(已下载字节数, 目标文件是否存在)；目标文件不存在时取可续传的 .part 文件大小"""
+    size = _local_file_size(path)
+    if size is not None:
+        return size, True
+    return _local_file_size(path + PARTIAL_SUFFIX), False
+
+
+def _int_setting(settings: QSettings, key: str, default: int) -> int:
+    """读取整数设置，存储的值为空或无法转换时返回默认值，避免单个损坏的配置项导致窗口无法启动"""
+    try:
+        return settings.value(key, default, type=int)
+    except (TypeError, ValueError):
+        return default
+
+
+def write_tasks_file(data: List[Dict], filename: str):
+    """原子写入任务文件：先写入临时文件，再替换原文件"""
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        f.write(content)
+        # 确保文件立即写入磁盘
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+
+
+class SaveTasksSignals(QObject):
+    """保存任务文件信号"""
+    failed = pyqtSignal(str)  # error message
+
+
+class SaveTasksWorker(QRunnable):
+    """在后台线程写入任务文件"""
+
+    def __init__(self, data: List[Dict], filename: str):
+        super().__init__()
+        self.data = data
+        self.filename = filename
+        self.signals = SaveTasksSignals()
+
+    def run(self):
+        try:
+            write_tasks_file(self.data, self.filename)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+@contextmanager
+def table_batch(view: QTableView):
+    """批量修改表格期间暂停重绘和排序，结束后统一刷新一次
+
+    仅用于整表重置、批量移除等结构性修改；进度刷新走模型的按单元格 dataChanged，
+    不要包在这里，否则每次都会整表重绘
+    """
+    sorting = view.isSortingEnabled()
+    view.setUpdatesEnabled(False)
+    view.setSortingEnabled(False)
+    try:
+        yield view
+    finally:
+        view.setSortingEnabled(sorting)
+        view.setUpdatesEnabled(True)
+        view.viewport().update()
+
+
 class HuggingFaceDownloader(QMainWindow):
     def __init__(self):
         super().__init__()
         self.tasks: Dict[str, DownloadTask] = {}
         self.download_manager = MultiThreadDownloadManager(max_workers=4)
         self.settings = QSettings('HFDownloader', 'Config')
+        self._last_selected_files: List[str] = []  # 最近一次通过文件对话框选择的文件
+        self._settings_snapshot: Dict[str, object] = {}  # 上次加载/保存时的设置
+
+        # 界面刷新定时器：进度、状态栏等高频更新只做标记，合并到下一次定时器触发时统一刷新
+        self._pending_status = None
+        # 日志框最多保留 LOG_MAX_LINES 行，窗口最小化期间缓冲区也只需保留这么多
+        self._log_buffer: deque = deque(maxlen=LOG_MAX_LINES)
+        self._dirty_task_ids = set()
+        self._refresh_pending = False  # 总进度需要刷新
+        self._refresh_all_rows = False  # 整个表格需要刷新
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(150)
+        self._repaint_timer.timeout.connect(self._flush_ui)
+
+        # 总进度统计：状态计数和进度总和随任务变化增量维护
+        self._status_counts: Counter = Counter()
+        self._progress_sum = 0.0
+
+        # 任务文件延迟保存：最多每秒写入一次，在后台线程中按顺序写入
+        self._tasks_filename = "tasks.json"
+        self._save_dirty = False  # 任务数据自上次保存后是否有变化
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(1000)
+        self._save_timer.timeout.connect(self._do_save_tasks)
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1)
+
+        # 日志时间戳缓存，同一秒内的日志复用格式化结果
+        self._last_ts_sec = 0
+        self._last_ts_str = ""
 
         self.init_ui()
         self.setup_connections()
@@ -428,6 +1050,39 @@ class HuggingFaceDownloader(QMainWindow):
         self.load_tasks_from_file()  # 启动时加载任务
 
     def save_tasks_to_file(self, filename="tasks.json"):
+        """延迟保存任务文件"""
+        self._tasks_filename = filename
+        self._save_dirty = True
+        # 定时器运行中不重新计时，持续有任务完成时也能按时落盘
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def flush_tasks_file(self):
+        """立即同步保存任务文件（退出前调用）"""
+        self._save_timer.stop()
+        self._save_pool.waitForDone()
+        if not self._save_dirty:
+            return
+        self._save_dirty = False
+        try:
+            write_tasks_file(self._tasks_snapshot(), self._tasks_filename)
+        except Exception as e:
+            self.log(f"保存任务文件失败: {e}")
+
+    def _do_save_tasks(self):
+        if not self._save_dirty:
+            return
+        self._save_dirty = False
+        worker = SaveTasksWorker(self._tasks_snapshot(), self._tasks_filename)
+        worker.signals.failed.connect(self._on_save_tasks_failed)
+        self._save_pool.start(worker)
+
+    def _on_save_tasks_failed(self, error: str):
+        self._save_dirty = True  # 退出时再尝试保存
+        self.log(f"保存任务文件失败: {error}")
+
+    def _tasks_snapshot(self) -> List[Dict]:
+        """获取需要保存的任务数据"""
         data = []
         for task in self.tasks.values():
             if task.status == "已完成":
@@ -443,15 +1098,9 @@ class HuggingFaceDownloader(QMainWindow):
                 "downloaded": task.downloaded,
                 "speed": task.speed,
                 "task_id": task.task_id,
+                "etag": task.etag,
             })
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                # 确保文件立即写入磁盘
-                f.flush()
-                os.fsync(f.fileno())
-        except Exception as e:
-            self.log(f"保存任务文件失败: {e}")
+        return data
 
     def load_tasks_from_file(self, filename="tasks.json"):
         if not os.path.exists(filename):
@@ -459,18 +1108,20 @@ class HuggingFaceDownloader(QMainWindow):
         try:
             with open(filename, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            for item in data:
-                if item["status"] == "已完成":
-                    continue
-                task = DownloadTask(**item)
-                # 检查本地文件实际大小
-                local_file_path = os.path.join(task.local_dir, task.repo_id, task.filename)
-                if os.path.exists(local_file_path):
-                    file_size = os.path.getsize(local_file_path)
+            tasks = [DownloadTask(**item) for item in data if item["status"] != "已完成"]
+
+            # 并发获取本地文件实际大小，网络盘等慢速文件系统上逐个 stat 会卡住界面
+            paths = [os.path.join(task.local_path, task.filename) for task in tasks]
+            with ThreadPoolExecutor(max_workers=min(16, len(paths) or 1)) as executor:
+                states = list(executor.map(_local_download_state, paths))
+
+            for task, (file_size, file_exists) in zip(tasks, states):
+                if file_size is not None:
                     task.downloaded = file_size
                     if task.size > 0:
                         task.progress = (file_size / task.size) * 100
-                        if file_size >= task.size:
+                        # 目标文件只在下载完成后生成，.part 文件再大也不算完成
+                        if file_exists and file_size >= task.size:
                             task.status = "已完成"
                         elif task.status not in ["失败"]:
                             task.status = "待下载"
@@ -486,6 +1137,8 @@ class HuggingFaceDownloader(QMainWindow):
                         task.status = "待下载"
 
                 self.tasks[task.task_id] = task
+            self._rebuild_task_stats()
+            # 全部处理完后一次性重置表格模型
             self.update_task_table()
             self.update_overall_progress()
             self.log(f"已加载 {len(self.tasks)} 个历史任务")
@@ -514,6 +1167,8 @@ class HuggingFaceDownloader(QMainWindow):
 
         # 代理选项卡
         self.proxy_widget = ProxyConfigWidget()
+        self._proxy_config = self.proxy_widget.get_config()  # 之后由 configChanged 推送更新
+        self.proxy_widget.configChanged.connect(self._on_proxy_config_changed)
         tab_widget.addTab(self.proxy_widget, "代理设置")
 
         # 设置选项卡
@@ -591,11 +1246,11 @@ class HuggingFaceDownloader(QMainWindow):
         task_layout = QVBoxLayout()
 
         # 表格
-        self.task_table = QTableWidget()
-        self.task_table.setColumnCount(8)
-        self.task_table.setHorizontalHeaderLabels([
-            "仓库", "文件名", "状态", "进度", "已下载", "总大小", "速度", "保存路径"
-        ])
+        self.task_model = TaskTableModel(self)
+        self.task_table = QTableView()
+        self.task_table.setModel(self.task_model)
+        # 按行选择，便于通过 selectedRows() 直接获取选中行
+        self.task_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
 
         # 设置自定义委托
         self.progress_delegate = ProgressItemDelegate()
@@ -657,8 +1312,10 @@ class HuggingFaceDownloader(QMainWindow):
         log_group = QGroupBox("下载日志")
         log_layout = QVBoxLayout()
 
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        # 限制日志行数，超出后自动丢弃最早的行
+        self.log_text.setMaximumBlockCount(LOG_MAX_LINES)
         log_layout.addWidget(self.log_text)
 
         log_group.setLayout(log_layout)
@@ -682,7 +1339,14 @@ class HuggingFaceDownloader(QMainWindow):
         self.concurrent_spin = QSpinBox()
         self.concurrent_spin.setRange(1, 10)
         self.concurrent_spin.setValue(4)
-        self.concurrent_spin.valueChanged.connect(self.update_concurrent_downloads)
+        # 防抖：连续调整时只在停止操作后应用最后一次的值
+        self._concurrent_timer = QTimer(self)
+        self._concurrent_timer.setSingleShot(True)
+        self._concurrent_timer.setInterval(300)
+        self._concurrent_timer.timeout.connect(
+            lambda: self.update_concurrent_downloads(self.concurrent_spin.value())
+        )
+        self.concurrent_spin.valueChanged.connect(lambda _: self._concurrent_timer.start())
         concurrent_layout.addWidget(self.concurrent_spin)
         concurrent_layout.addWidget(QLabel("个"))
         concurrent_layout.addStretch()
@@ -748,7 +1412,7 @@ class HuggingFaceDownloader(QMainWindow):
     def setup_connections(self):
         """设置信号连接"""
         # 下载管理器信号
-        self.download_manager.signals.progress_updated.connect(self.on_progress_updated)
+        self.download_manager.signals.batch_updated.connect(self.on_batch_updated)
         self.download_manager.signals.task_completed.connect(self.on_task_completed)
         self.download_manager.signals.task_started.connect(self.on_task_started)
         self.download_manager.all_completed.connect(self.on_all_completed)
@@ -777,6 +1441,7 @@ class HuggingFaceDownloader(QMainWindow):
             )
 
             if selected_files:
+                self._last_selected_files = selected_files
                 self.files_input.setPlainText('\n'.join(selected_files))
                 self.log(f"已选择 {len(selected_files)} 个文件")
             else:
@@ -812,8 +1477,13 @@ class HuggingFaceDownloader(QMainWindow):
             QMessageBox.warning(self, "警告", "请选择保存目录")
             return
 
-        files = [f.strip() for f in files_text.split('\n') if f.strip()]
+        # 文本未被手动修改时直接复用对话框返回的列表，无需重新解析
+        if self._last_selected_files and files_text == '\n'.join(self._last_selected_files):
+            files = self._last_selected_files
+        else:
+            files = list(filter(None, map(str.strip, files_text.splitlines())))
 
+        new_tasks = []
         for filename in files:
             task = DownloadTask(
                 repo_id=repo_id,
@@ -822,7 +1492,10 @@ class HuggingFaceDownloader(QMainWindow):
                 revision=revision
             )
             self.tasks[task.task_id] = task
-        self.update_task_table()
+            new_tasks.append(task)
+        self._rebuild_task_stats()
+        self.task_model.add_tasks(new_tasks)
+        self._request_refresh()
         self.save_tasks_to_file()
         self.log(f"已添加 {len(files)} 个下载任务")
 
@@ -833,7 +1506,9 @@ class HuggingFaceDownloader(QMainWindow):
             return
 
         self.tasks.clear()
+        self._rebuild_task_stats()
         self.update_task_table()
+        self._request_refresh()
         self.save_tasks_to_file()
         self.log("已清空任务队列")
 
@@ -843,67 +1518,26 @@ class HuggingFaceDownloader(QMainWindow):
             QMessageBox.warning(self, "警告", "下载进行中，无法移除任务")
             return
 
-        selected_rows = set()
-        for item in self.task_table.selectedItems():
-            selected_rows.add(item.row())
-
-        task_ids = list(self.tasks.keys())
+        # selectedRows() 每行只返回一个索引，无需逐个单元格去重
+        selected_rows = sorted(
+            (index.row() for index in self.task_table.selectionModel().selectedRows()),
+            reverse=True
+        )
 
-        # 从后往前删除，避免索引问题
-        for row in sorted(selected_rows, reverse=True):
-            if 0 <= row < len(task_ids):
-                task_id = task_ids[row]
-                del self.tasks[task_id]
+        for row in selected_rows:
+            del self.tasks[self.task_model.task_id_at(row)]
 
-        self.update_task_table()
+        self._rebuild_task_stats()
+        with table_batch(self.task_table):
+            self.task_model.remove_rows(selected_rows)
+        self._request_refresh()
         self.save_tasks_to_file()
         self.log(f"已移除 {len(selected_rows)} 个任务")
 
     def update_task_table(self):
         """更新任务表格 - 优化版"""
-        self.task_table.setRowCount(len(self.tasks))
-
-        for i, (task_id, task) in enumerate(self.tasks.items()):
-            # 仓库名
-            repo_item = QTableWidgetItem(task.repo_id)
-            self.task_table.setItem(i, 0, repo_item)
-
-            # 文件名
-            file_item = QTableWidgetItem(task.filename)
-            self.task_table.setItem(i, 1, file_item)
-
-            # 状态
-            status_item = QTableWidgetItem(task.status)
-            # 根据状态设置颜色
-            if task.status == "已完成":
-                status_item.setForeground(QColor(76, 175, 80))
-            elif task.status == "失败":
-                status_item.setForeground(QColor(244, 67, 54))
-            elif task.status == "下载中":
-                status_item.setForeground(QColor(33, 150, 243))
-            elif task.status == "暂停":
-                status_item.setForeground(QColor(255, 152, 0))
-            self.task_table.setItem(i, 2, status_item)
-
-            # 进度条
-            progress_item = QTableWidgetItem(f"{task.progress:.1f}%")
-            progress_item.setData(Qt.ItemDataRole.UserRole, task.progress)
-            self.task_table.setItem(i, 3, progress_item)
-
-            # 已下载
-            downloaded_text = self.format_size(task.downloaded) if task.downloaded > 0 else "--"
-            self.task_table.setItem(i, 4, QTableWidgetItem(downloaded_text))
-
-            # 总大小
-            size_text = self.format_size(task.size) if task.size > 0 else "--"
-            self.task_table.setItem(i, 5, QTableWidgetItem(size_text))
-
-            # 速度
-            self.task_table.setItem(i, 6, QTableWidgetItem(task.speed))
-
-            # 保存路径
-            local_path = os.path.join(task.local_dir, task.repo_id)
-            self.task_table.setItem(i, 7, QTableWidgetItem(local_path))
+        with table_batch(self.task_table):
+            self.task_model.set_tasks(self.tasks.values())
 
     def start_download(self):
         """开始下载 - 优化版"""
@@ -911,10 +1545,12 @@ class HuggingFaceDownloader(QMainWindow):
             QMessageBox.warning(self, "警告", "没有下载任务")
             return
 
-        proxy_config = self.proxy_widget.get_config()
-        
+        # 刚输入完尚未应用的修改在此立即生效，并通过 configChanged 更新缓存
+        self.proxy_widget.flush_pending_config()
+        proxy_config = self._proxy_config
+
         # 获取token
-        token = self.token_input.text().strip() if hasattr(self, 'token_input') else None
+        token = self.token_input.text().strip() or None
 
         # 包含待下载、失败和暂停状态的任务
         pending_tasks = [task for task in self.tasks.values()
@@ -926,18 +1562,25 @@ class HuggingFaceDownloader(QMainWindow):
 
         # 开始下载前，更新所有待下载任务的状态
         for task in pending_tasks:
-            if task.status in ["暂停", "待下载"]:
-                task.status = "准备中"
-            elif task.status == "失败":
-                task.status = "准备中"
-
-        self.update_task_table()
+            self._set_status(task, "准备中")
 
-        # 传入token参数
-        self.download_manager.start_downloads(pending_tasks, proxy_config, token)
+        # “准备中”很快会被“下载中”覆盖，只请求延迟刷新，线程及时启动时这一中间状态不会被绘制
+        self._request_refresh(*(task.task_id for task in pending_tasks))
         self.start_btn.setEnabled(False)
         self.pause_btn.setEnabled(True)
 
+        # 点击处理函数先返回，按钮和表格状态刷新后再在下一轮事件循环中创建下载线程
+        QTimer.singleShot(0, lambda: self._kickoff_downloads(pending_tasks, proxy_config, token))
+
+    def _kickoff_downloads(self, pending_tasks: List[DownloadTask], proxy_config: Dict, token: Optional[str]):
+        """提交下载任务到线程池"""
+        # 期间已点击暂停的任务会被回退为“待下载”，不再启动
+        pending_tasks = [task for task in pending_tasks if task.status == "准备中"]
+        if not pending_tasks:
+            return
+
+        # 传入token参数
+        self.download_manager.start_downloads(pending_tasks, proxy_config, token)
         self.log(f"开始下载 {len(pending_tasks)} 个任务...")
 
     def pause_download(self):
@@ -949,25 +1592,33 @@ class HuggingFaceDownloader(QMainWindow):
         # 只将正在下载的任务设为“暂停”，准备中的任务回退为“待下载”
         for task in self.tasks.values():
             if task.status == "下载中":
-                task.status = "暂停"
+                self._set_status(task, "暂停")
             elif task.status == "准备中":
-                task.status = "待下载"
+                self._set_status(task, "待下载")
 
-        self.update_task_table()
-        self.update_overall_progress()
+        self._request_refresh(all_rows=True)
         self.save_tasks_to_file()
         self.log("下载已暂停，可点击开始下载继续")
 
     def update_concurrent_downloads(self, value: int):
         """更新并发下载数"""
-        self.download_manager.thread_pool.setMaxThreadCount(value)
-        self.log(f"并发下载数已设置为: {value}")
+        actual = self.download_manager.set_max_workers(value)
+        if actual != value:
+            self.log(f"并发下载数 {value} 超过本机建议上限，已限制为: {actual}")
+        else:
+            self.log(f"并发下载数已设置为: {value}")
 
     def on_task_started(self, task_id: str):
         """任务开始回调 - 优化版"""
         if task_id in self.tasks:
-            self.tasks[task_id].status = "下载中"
-            self.update_task_table()
+            self._set_status(self.tasks[task_id], "下载中")
+            self._request_refresh(task_id)
+
+    def on_batch_updated(self, updates: list):
+        """批量进度更新回调"""
+        self._save_dirty = True  # 进度只在退出或下一次保存时写入
+        for task_id, progress, speed, status, downloaded, total in updates:
+            self.on_progress_updated(task_id, progress, speed, status, downloaded, total)
 
     def on_progress_updated(self, task_id: str, progress: float, speed: str,
                             status: str, downloaded: int = None, total: int = None):
@@ -976,21 +1627,17 @@ class HuggingFaceDownloader(QMainWindow):
             task = self.tasks[task_id]
 
             # 更新任务信息
-            task.progress = progress
+            self._set_progress(task, progress)
             task.speed = speed
-            task.status = status
+            self._set_status(task, status)
 
             if downloaded is not None:
                 task.downloaded = downloaded
             if total is not None and total > 0:
                 task.size = total
 
-            # 限制UI更新频率
-            current_time = time.time()
-            if not hasattr(self, '_last_ui_update') or current_time - self._last_ui_update > 0.2:
-                self.update_task_table()
-                self.update_overall_progress()
-                self._last_ui_update = current_time
+            # 只标记，由刷新定时器统一更新表格和总进度
+            self._request_refresh(task_id)
 
     def on_task_completed(self, task_id: str, success: bool, message: str):
         """任务完成回调 - 优化版"""
@@ -999,15 +1646,15 @@ class HuggingFaceDownloader(QMainWindow):
         if task_id in self.tasks:
             task = self.tasks[task_id]
             if success:
-                task.status = "已完成"
-                task.progress = 100.0
+                self._set_status(task, "已完成")
+                self._set_progress(task, 100.0)
                 task.speed = "完成"
             else:
-                task.status = "失败"
+                self._set_status(task, "失败")
                 task.speed = "失败"
 
-        self.update_task_table()
-        self.update_overall_progress()
+            self._request_refresh(task_id)
+
         self.save_tasks_to_file()
 
     def on_all_completed(self):
@@ -1016,8 +1663,8 @@ class HuggingFaceDownloader(QMainWindow):
         self.pause_btn.setEnabled(False)
 
         # 显示完成统计
-        completed_count = sum(1 for task in self.tasks.values() if task.status == "已完成")
-        failed_count = sum(1 for task in self.tasks.values() if task.status == "失败")
+        completed_count = self._status_counts["已完成"]
+        failed_count = self._status_counts["失败"]
 
         self.log(f"所有下载任务完成 - 成功: {completed_count}, 失败: {failed_count}")
 
@@ -1037,6 +1684,23 @@ class HuggingFaceDownloader(QMainWindow):
                 f"💡 可重新点击开始下载重试失败的任务"
             )
 
+    def _set_status(self, task: DownloadTask, status: str):
+        """修改任务状态并同步状态计数"""
+        if task.status != status:
+            self._status_counts[task.status] -= 1
+            self._status_counts[status] += 1
+            task.status = status
+
+    def _set_progress(self, task: DownloadTask, progress: float):
+        """修改任务进度并同步进度总和"""
+        self._progress_sum += progress - task.progress
+        task.progress = progress
+
+    def _rebuild_task_stats(self):
+        """任务增删后重新统计状态计数和进度总和"""
+        self._status_counts = Counter(task.status for task in self.tasks.values())
+        self._progress_sum = sum(task.progress for task in self.tasks.values())
+
     def update_overall_progress(self):
         """更新总进度 - 优化版"""
         if not self.tasks:
@@ -1044,75 +1708,160 @@ class HuggingFaceDownloader(QMainWindow):
             self.progress_label.setText("0/0")
             return
 
-        completed_count = sum(1 for task in self.tasks.values() if task.status == "已完成")
+        # 直接读取增量维护的统计值，无需遍历任务
+        completed_count = self._status_counts["已完成"]
         total_count = len(self.tasks)
 
         # 计算总体进度
-        total_progress = sum(task.progress for task in self.tasks.values())
-        overall = total_progress / total_count if total_count > 0 else 0
+        overall = self._progress_sum / total_count
 
         self.overall_progress.setValue(int(overall))
         self.progress_label.setText(f"{completed_count}/{total_count}")
 
+    def _now_hms(self) -> str:
+        """当前时间 HH:MM:SS，同一秒内复用上次格式化的结果"""
+        now = int(time.time())
+        if now != self._last_ts_sec:
+            self._last_ts_sec = now
+            self._last_ts_str = time.strftime("%H:%M:%S", time.localtime(now))
+        return self._last_ts_str
+
     def log(self, message: str):
         """添加日志 - 优化版"""
-        timestamp = time.strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-        self.log_text.append(formatted_message)
-
-        # 自动滚动到底部
-        scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
-
-        self.statusBar().showMessage(message)
+        # 日志先写入缓冲区，由刷新定时器一次性追加到日志框
+        self._log_buffer.append(f"[{self._now_hms()}] {message}")
+
+        # 状态栏只显示最新一条消息，由刷新定时器统一更新
+        self._pending_status = message
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
+    def _request_refresh(self, *task_ids: str, all_rows: bool = False):
+        """请求刷新界面：标记需要更新的任务行，由刷新定时器统一处理，同时刷新总进度"""
+        self._dirty_task_ids.update(task_ids)
+        self._refresh_all_rows = self._refresh_all_rows or all_rows
+        self._refresh_pending = True
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
+    def _ui_hidden(self) -> bool:
+        """窗口不可见或已最小化"""
+        return not self.isVisible() or bool(self.windowState() & Qt.WindowState.WindowMinimized)
+
+    def _flush_ui(self):
+        """定时刷新界面"""
+        # 窗口不可见时不刷新，待刷新的标记保留到窗口恢复时一次性补上
+        if self._ui_hidden():
+            return
 
-    def format_size(self, size_bytes: int) -> str:
-        """格式化文件大小"""
-        if size_bytes == 0:
-            return "0 B"
+        if self._refresh_pending:
+            # 直接通知模型，视图只重绘取值变化的单元格
+            if self._refresh_all_rows:
+                self.task_model.refresh()
+            else:
+                for task_id in self._dirty_task_ids:
+                    self.task_model.task_updated(task_id)
+            self._dirty_task_ids.clear()
+            self._refresh_all_rows = False
+            self._refresh_pending = False
+            self.update_overall_progress()
 
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        if self._log_buffer:
+            self.log_text.appendPlainText("\n".join(self._log_buffer))
+            self._log_buffer.clear()
+
+            # 自动滚动到底部
+            self.log_text.moveCursor(QTextCursor.MoveOperation.End)
+
+        if self._pending_status is not None:
+            self.statusBar().showMessage(self._pending_status)
+            self._pending_status = None
+
+    def _on_proxy_config_changed(self, config: Dict):
+        """代理配置变化时更新缓存"""
+        self._proxy_config = config
+
+    def _current_settings(self) -> Dict[str, object]:
+        """界面上当前的设置，键为 QSettings 中的完整路径"""
+        self.proxy_widget.flush_pending_config()
+        proxy_config = self._proxy_config
+        return {
+            "main/repo_id": self.repo_input.text(),
+            "main/local_dir": self.dir_input.text(),
+            "main/revision": self.revision_input.text(),
+            "main/concurrent_downloads": self.concurrent_spin.value(),
+            "main/retry_count": self.retry_spin.value(),
+            # Huggingface Token
+            "main/hf_token": self.token_input.text(),
+            # 代理设置
+            "proxy/enabled": proxy_config.get('enabled', False),
+            "proxy/host": proxy_config.get('proxy_host', ''),
+            "proxy/port": proxy_config.get('proxy_port', 7890),
+        }
 
     def save_settings(self):
-        """保存设置"""
-        self.settings.setValue("repo_id", self.repo_input.text())
-        self.settings.setValue("local_dir", self.dir_input.text())
-        self.settings.setValue("revision", self.revision_input.text())
-        self.settings.setValue("concurrent_downloads", self.concurrent_spin.value())
-        self.settings.setValue("retry_count", self.retry_spin.value())
-        
-        # 保存Huggingface Token
-        self.settings.setValue("hf_token", self.token_input.text())
-
-        # 保存代理设置
-        proxy_config = self.proxy_widget.get_config()
-        self.settings.setValue("proxy_enabled", proxy_config.get('enabled', False))
-        self.settings.setValue("proxy_host", proxy_config.get('proxy_host', ''))
-        self.settings.setValue("proxy_port", proxy_config.get('proxy_port', ''))
-        
-        # 立即同步设置到磁盘
+        """保存设置，只写入自加载以来有变化的项"""
+        current = self._current_settings()
+        changed = {key: value for key, value in current.items()
+                   if self._settings_snapshot.get(key) != value}
+        if not changed:
+            return
+
+        for key, value in changed.items():
+            self.settings.setValue(key, value)
+        # 所有设置写完后统一同步到磁盘一次
         self.settings.sync()
-        
-        self.save_tasks_to_file()
+        self._settings_snapshot = current
+
+    def _migrate_legacy_settings(self):
+        """将旧版本的设置迁移到当前的分组"""
+        settings = self.settings
+        # 最早的版本保存在根分组下
+        for key in settings.childKeys():
+            settings.setValue(f"main/{key}", settings.value(key))
+            settings.remove(key)
+        # 代理设置从 main 分组移到 proxy 分组
+        for old_key, new_key in (("main/proxy_enabled", "proxy/enabled"),
+                                 ("main/proxy_host", "proxy/host"),
+                                 ("main/proxy_port", "proxy/port")):
+            if settings.contains(old_key):
+                settings.setValue(new_key, settings.value(old_key))
+                settings.remove(old_key)
 
     def load_settings(self):
         """加载设置"""
-        self.repo_input.setText(self.settings.value("repo_id", ""))
-        self.dir_input.setText(self.settings.value("local_dir", "./downloads"))
-        self.revision_input.setText(self.settings.value("revision", "main"))
-        self.concurrent_spin.setValue(int(self.settings.value("concurrent_downloads", 4)))
-        self.retry_spin.setValue(int(self.settings.value("retry_count", 3)))
-        
+        self._migrate_legacy_settings()
+
+        settings = self.settings
+        settings.beginGroup("main")
+        self.repo_input.setText(settings.value("repo_id", "", type=str))
+        self.dir_input.setText(settings.value("local_dir", "./downloads", type=str))
+        self.revision_input.setText(settings.value("revision", "main", type=str))
+        self.concurrent_spin.setValue(min(_int_setting(settings, "concurrent_downloads", 4), max_worker_limit()))
+        self.retry_spin.setValue(_int_setting(settings, "retry_count", 3))
+
         # 加载Huggingface Token
-        self.token_input.setText(self.settings.value("hf_token", ""))
+        self.token_input.setText(settings.value("hf_token", "", type=str))
+        settings.endGroup()
 
-        self.proxy_widget.proxy_enabled.setChecked(bool(self.settings.value("proxy_enabled", False)))
-        self.proxy_widget.proxy_host.setText(self.settings.value("proxy_host", ""))
-        self.proxy_widget.proxy_port.setValue(int(self.settings.value("proxy_port", 7890)))
+        settings.beginGroup("proxy")
+        self.proxy_widget.proxy_enabled.setChecked(settings.value("enabled", False, type=bool))
+        self.proxy_widget.proxy_host.setText(settings.value("host", "", type=str))
+        self.proxy_widget.proxy_port.setText(str(_int_setting(settings, "port", 7890)))
+        settings.endGroup()
+
+        # 记录加载后的设置，保存时只写入变化的项
+        self._settings_snapshot = self._current_settings()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._flush_ui()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # 从最小化恢复时补上期间积压的刷新
+        if event.type() == QEvent.Type.WindowStateChange and not self._ui_hidden():
+            self._flush_ui()
 
     def closeEvent(self, event):
         """关闭事件 - 优化版"""
@@ -1130,18 +1879,25 @@ class HuggingFaceDownloader(QMainWindow):
 
             if reply == QMessageBox.StandardButton.Yes:
                 self.download_manager.cancel_all()
+                self.flush_tasks_file()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.flush_tasks_file()
             event.accept()
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     app = QApplication(sys.argv)
     app.setApplicationName("HuggingFace Downloader")
     app.setOrganizationName("HFDownloader")
 
+    # 进度条委托使用的图像缓存上限（KB）
+    QPixmapCache.setCacheLimit(20 * 1024)
+
     # 设置应用图标和样式
     app.setStyle('Fusion')
     app.setWindowIcon(QIcon(ICON_PATH))
@@ -0,0 +1,53 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 连接池：按主机缓存的连接池数，以及每个主机最多保持的连接数
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 50
+
+_session: Optional[requests.Session] = None
+_probe_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """
+    获取全局共享的 HTTP 会话（首次调用时创建）。
+    所有下载线程共用同一个连接池，已建立的 TCP/TLS 连接可以互相复用；
+    连接用尽时等待归还（pool_block），而不是临时新建又丢弃。
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=True,
+                max_retries=Retry(total=3, backoff_factor=0.5)
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def get_probe_session() -> requests.Session:
+    """
+    获取用于代理测试的 HTTP 会话（首次调用时创建）。
+    与下载会话分开且不做重试：代理不可用时应在 (连接, 读取) 超时内尽快失败，
+    而不是按下载会话的重试策略多次退避重连。
+    """
+    global _probe_session
+    with _session_lock:
+        if _probe_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _probe_session = session
+        return _probe_session
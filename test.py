@@ -1,9 +1,12 @@
 import os
 import sys
+import tempfile
 import time
 from huggingface_hub import HfApi
+from PyQt6.QtCore import QCoreApplication
 from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QTabWidget
 
+import main
 from ui.components.tree_file_selection_dialog import SelectionMode, HuggingfaceFileTreeWidget
 
 os.environ["HTTP_PROXY"] = "http://127.0.0.1:7890"
@@ -105,4 +108,74 @@ def test_huggingface_file_tree_widget():
         tree.load_data()
 
     main_window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
+
+
+class _FakeResponse:
+    """模拟 requests 的流式响应"""
+
+    def __init__(self, status_code: int, headers: dict, body: bytes = b""):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size: int = 1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _ShortRangeSession:
+    """支持分段下载的模拟会话，其中一个区间只返回一半数据"""
+
+    def __init__(self, data: bytes, short_start: int):
+        self.data = data
+        self.short_start = short_start
+
+    def head(self, url, **kwargs):
+        return _FakeResponse(200, {'content-length': str(len(self.data)), 'etag': '"v1"',
+                                   'accept-ranges': 'bytes'})
+
+    def get(self, url, headers=None, **kwargs):
+        start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+        body = self.data[start:end + 1]
+        if start == self.short_start:
+            body = body[:len(body) // 2]
+        return _FakeResponse(206, {'content-length': str(len(body))}, body)
+
+
+def test_parallel_download_short_range():
+    """分段下载中某个区间提前结束时，任务应失败并保留 .part 文件供续传，而不是报告下载完成"""
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    part_size = 1024
+    data = os.urandom(part_size * 4)
+    old_session, old_min_part = main.get_shared_session, main.PARALLEL_MIN_PART_SIZE
+    main.get_shared_session = lambda: _ShortRangeSession(data, short_start=part_size)
+    main.PARALLEL_MIN_PART_SIZE = part_size
+    try:
+        task = main.DownloadTask(repo_id="user/model", filename="model.bin", local_dir=tempfile.mkdtemp())
+        task.size = len(data)
+        signals = main.DownloadWorkerSignals()
+        results = []
+        signals.task_completed.connect(lambda *args: results.append(args))
+        main.SingleDownloadWorker(task, {}, signals).run()
+        app.processEvents()
+    finally:
+        main.get_shared_session, main.PARALLEL_MIN_PART_SIZE = old_session, old_min_part
+
+    local_file = os.path.join(task.local_path, task.filename)
+    assert len(results) == 1 and not results[0][1], results
+    assert not os.path.exists(local_file)
+    assert not os.path.exists(local_file + main.ACTIVE_SUFFIX)
+    # 第一个区间完整，第二个区间只下载了一半：.part 截断到连续有效的前缀
+    with open(local_file + main.PARTIAL_SUFFIX, 'rb') as f:
+        assert f.read() == data[:part_size + part_size // 2]
@@ -1,13 +1,46 @@
 import os
-import json
-from typing import List, Dict, Any, Optional, Callable, Union
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Callable
 from enum import Enum
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTreeWidget, QTreeWidgetItem, QLabel, QCheckBox,
+                             QTreeWidget, QTreeWidgetItem, QTreeWidgetItemIterator, QLabel, QCheckBox,
                              QProgressBar, QStackedWidget, QHeaderView, QStyle, QDialog, QDialogButtonBox, QMessageBox)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer, QFileInfo
-from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor, QFont
-from huggingface_hub import HfApi
+from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer, QSignalBlocker
+from PyQt6.QtGui import QIcon, QPixmap, QPixmapCache, QPainter, QColor, QFont, QBrush
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# 修改时间显示格式
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Hugging Face 分支（如 main）会随新提交移动，详细数据缓存超过该秒数后重新获取；
+# 完整 commit sha 指向的内容不会变化，不过期
+_HF_DETAIL_CACHE_TTL = 300
+_COMMIT_SHA_RE = re.compile(r"[0-9a-f]{40}")
+
+# 扩展名 -> 文件类型描述（Hugging Face 文件列表）
+_FILE_TYPE_MAPPING = {
+    '.py': 'Python脚本',
+    '.json': 'JSON配置',
+    '.txt': '文本文件',
+    '.md': 'Markdown文档',
+    '.yml': 'YAML配置',
+    '.yaml': 'YAML配置',
+    '.bin': '二进制文件',
+    '.safetensors': 'SafeTensors模型',
+    '.onnx': 'ONNX模型',
+    '.pt': 'PyTorch模型',
+    '.pth': 'PyTorch模型',
+    '.h5': 'HDF5模型',
+    '.pkl': 'Pickle文件',
+    '.gitattributes': 'Git属性',
+    '.gitignore': 'Git忽略',
+    '': '无扩展名文件'
+}
 
 
 class SelectionMode(Enum):
@@ -21,48 +54,71 @@ class SelectionMode(Enum):
 class IconProvider:
     """图标提供器"""
 
+    # 图标在进程内共享，首次创建 IconProvider 时构建一次
+    _icon_cache: Optional[Dict[str, QIcon]] = None
+
+    # 扩展名 -> 图标键
+    _EXT_MAP = {
+        **dict.fromkeys(('jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg', 'webp'), 'png'),
+        **dict.fromkeys(('zip', 'rar', '7z', 'tar', 'gz', 'bz2'), 'zip'),
+        **{ext: ext for ext in ('txt', 'py', 'js', 'html', 'css', 'json', 'xml', 'md', 'pdf')},
+    }
+
+    # 特殊文件夹名 -> 图标键
+    _FOLDER_MAP = {
+        '.git': 'git',
+        '.idea': 'idea',
+        '.vscode': 'idea',
+        'node_modules': 'node_modules',
+    }
+
     def __init__(self):
-        self._icon_cache = {}
-        self._init_default_icons()
+        if IconProvider._icon_cache is None:
+            IconProvider._init_default_icons()
 
-    def _init_default_icons(self):
+    @classmethod
+    def _init_default_icons(cls):
         """初始化默认图标"""
         # 使用系统提供的标准图标
         style = QStyle.StandardPixmap
+        cache = {}
 
         # 文件夹图标
-        self._icon_cache['folder'] = self._get_system_icon(style.SP_DirIcon)
-        self._icon_cache['folder_open'] = self._get_system_icon(style.SP_DirOpenIcon)
-        self._icon_cache['folder_hidden'] = self._create_hidden_folder_icon()
+        cache['folder'] = cls._get_system_icon(style.SP_DirIcon)
+        cache['folder_open'] = cls._get_system_icon(style.SP_DirOpenIcon)
+        cache['folder_hidden'] = cls._create_hidden_folder_icon()
 
         # 通用文件图标
-        self._icon_cache['file'] = self._get_system_icon(style.SP_FileIcon)
-        self._icon_cache['file_hidden'] = self._create_hidden_file_icon()
+        cache['file'] = cls._get_system_icon(style.SP_FileIcon)
+        cache['file_hidden'] = cls._create_hidden_file_icon()
 
         # 特定文件类型图标
-        self._icon_cache['txt'] = self._create_text_icon()
-        self._icon_cache['py'] = self._create_python_icon()
-        self._icon_cache['js'] = self._create_javascript_icon()
-        self._icon_cache['html'] = self._create_html_icon()
-        self._icon_cache['css'] = self._create_css_icon()
-        self._icon_cache['json'] = self._create_json_icon()
-        self._icon_cache['xml'] = self._create_xml_icon()
-        self._icon_cache['md'] = self._create_markdown_icon()
-        self._icon_cache['jpg'] = self._get_system_icon(style.SP_FileDialogDetailedView)
-        self._icon_cache['png'] = self._get_system_icon(style.SP_FileDialogDetailedView)
-        self._icon_cache['gif'] = self._get_system_icon(style.SP_FileDialogDetailedView)
-        self._icon_cache['pdf'] = self._create_pdf_icon()
-        self._icon_cache['zip'] = self._create_archive_icon()
-        self._icon_cache['rar'] = self._create_archive_icon()
-        self._icon_cache['7z'] = self._create_archive_icon()
+        cache['txt'] = cls._create_text_icon()
+        cache['py'] = cls._create_python_icon()
+        cache['js'] = cls._create_javascript_icon()
+        cache['html'] = cls._create_html_icon()
+        cache['css'] = cls._create_css_icon()
+        cache['json'] = cls._create_json_icon()
+        cache['xml'] = cls._create_xml_icon()
+        cache['md'] = cls._create_markdown_icon()
+        cache['jpg'] = cls._get_system_icon(style.SP_FileDialogDetailedView)
+        cache['png'] = cls._get_system_icon(style.SP_FileDialogDetailedView)
+        cache['gif'] = cls._get_system_icon(style.SP_FileDialogDetailedView)
+        cache['pdf'] = cls._create_pdf_icon()
+        cache['zip'] = cls._create_archive_icon()
+        cache['rar'] = cls._create_archive_icon()
+        cache['7z'] = cls._create_archive_icon()
 
         # 特殊文件夹图标
-        self._icon_cache['git'] = self._create_git_icon()
-        self._icon_cache['idea'] = self._create_idea_icon()
-        self._icon_cache['vscode'] = self._create_vscode_icon()
-        self._icon_cache['node_modules'] = self._create_node_modules_icon()
+        cache['git'] = cls._create_git_icon()
+        cache['idea'] = cls._create_idea_icon()
+        cache['vscode'] = cls._create_vscode_icon()
+        cache['node_modules'] = cls._create_node_modules_icon()
 
-    def _get_system_icon(self, icon_type) -> QIcon:
+        cls._icon_cache = cache
+
+    @staticmethod
+    def _get_system_icon(icon_type) -> QIcon:
         """获取系统图标"""
         try:
             from PyQt6.QtWidgets import QApplication
@@ -73,8 +129,15 @@ class IconProvider:
             pass
         return QIcon()
 
-    def _create_colored_icon(self, text: str, color: QColor, size: int = 16) -> QIcon:
+    @staticmethod
+    def _create_colored_icon(text: str, color: QColor, size: int = 16) -> QIcon:
         """创建带颜色的文本图标"""
+        # 登记到 QPixmapCache，相同文字和颜色的图标共用同一份像素数据
+        key = f"hfd_icon:{text}:{color.rgba():08x}:{size}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None:
+            return QIcon(pixmap)
+
         pixmap = QPixmap(size, size)
         pixmap.fill(Qt.GlobalColor.transparent)
 
@@ -95,100 +158,100 @@ class IconProvider:
         painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
 
         painter.end()
+        QPixmapCache.insert(key, pixmap)
         return QIcon(pixmap)
 
-    def _create_text_icon(self) -> QIcon:
-        return self._create_colored_icon("TXT", QColor(100, 100, 100))
+    @classmethod
+    def _create_text_icon(cls) -> QIcon:
+        return cls._create_colored_icon("TXT", QColor(100, 100, 100))
 
-    def _create_python_icon(self) -> QIcon:
-        return self._create_colored_icon("PY", QColor(55, 118, 171))
+    @classmethod
+    def _create_python_icon(cls) -> QIcon:
+        return cls._create_colored_icon("PY", QColor(55, 118, 171))
 
-    def _create_javascript_icon(self) -> QIcon:
-        return self._create_colored_icon("JS", QColor(240, 219, 79))
+    @classmethod
+    def _create_javascript_icon(cls) -> QIcon:
+        return cls._create_colored_icon("JS", QColor(240, 219, 79))
 
-    def _create_html_icon(self) -> QIcon:
-        return self._create_colored_icon("HTML", QColor(227, 79, 38))
+    @classmethod
+    def _create_html_icon(cls) -> QIcon:
+        return cls._create_colored_icon("HTML", QColor(227, 79, 38))
 
-    def _create_css_icon(self) -> QIcon:
-        return self._create_colored_icon("CSS", QColor(21, 114, 182))
+    @classmethod
+    def _create_css_icon(cls) -> QIcon:
+        return cls._create_colored_icon("CSS", QColor(21, 114, 182))
 
-    def _create_json_icon(self) -> QIcon:
-        return self._create_colored_icon("JSON", QColor(255, 204, 84))
+    @classmethod
+    def _create_json_icon(cls) -> QIcon:
+        return cls._create_colored_icon("JSON", QColor(255, 204, 84))
 
-    def _create_xml_icon(self) -> QIcon:
-        return self._create_colored_icon("XML", QColor(255, 153, 0))
+    @classmethod
+    def _create_xml_icon(cls) -> QIcon:
+        return cls._create_colored_icon("XML", QColor(255, 153, 0))
 
-    def _create_markdown_icon(self) -> QIcon:
-        return self._create_colored_icon("MD", QColor(0, 0, 0))
+    @classmethod
+    def _create_markdown_icon(cls) -> QIcon:
+        return cls._create_colored_icon("MD", QColor(0, 0, 0))
 
-    def _create_pdf_icon(self) -> QIcon:
-        return self._create_colored_icon("PDF", QColor(220, 53, 69))
+    @classmethod
+    def _create_pdf_icon(cls) -> QIcon:
+        return cls._create_colored_icon("PDF", QColor(220, 53, 69))
 
-    def _create_archive_icon(self) -> QIcon:
-        return self._create_colored_icon("ZIP", QColor(108, 117, 125))
+    @classmethod
+    def _create_archive_icon(cls) -> QIcon:
+        return cls._create_colored_icon("ZIP", QColor(108, 117, 125))
 
-    def _create_git_icon(self) -> QIcon:
-        return self._create_colored_icon("GIT", QColor(240, 80, 50))
+    @classmethod
+    def _create_git_icon(cls) -> QIcon:
+        return cls._create_colored_icon("GIT", QColor(240, 80, 50))
 
-    def _create_idea_icon(self) -> QIcon:
-        return self._create_colored_icon("IDE", QColor(255, 99, 71))
+    @classmethod
+    def _create_idea_icon(cls) -> QIcon:
+        return cls._create_colored_icon("IDE", QColor(255, 99, 71))
 
-    def _create_vscode_icon(self) -> QIcon:
-        return self._create_colored_icon("VSC", QColor(0, 120, 215))
+    @classmethod
+    def _create_vscode_icon(cls) -> QIcon:
+        return cls._create_colored_icon("VSC", QColor(0, 120, 215))
 
-    def _create_node_modules_icon(self) -> QIcon:
-        return self._create_colored_icon("NPM", QColor(203, 56, 55))
+    @classmethod
+    def _create_node_modules_icon(cls) -> QIcon:
+        return cls._create_colored_icon("NPM", QColor(203, 56, 55))
 
-    def _create_hidden_folder_icon(self) -> QIcon:
-        return self._create_colored_icon("◯", QColor(150, 150, 150))
+    @classmethod
+    def _create_hidden_folder_icon(cls) -> QIcon:
+        return cls._create_colored_icon("◯", QColor(150, 150, 150))
 
-    def _create_hidden_file_icon(self) -> QIcon:
-        return self._create_colored_icon("◯", QColor(120, 120, 120))
+    @classmethod
+    def _create_hidden_file_icon(cls) -> QIcon:
+        return cls._create_colored_icon("◯", QColor(120, 120, 120))
 
     def get_icon(self, file_info) -> QIcon:
         """根据文件信息获取图标"""
-        is_hidden = file_info.name.startswith('.')
+        cache = IconProvider._icon_cache
+        name = file_info.name
 
         if file_info.is_dir:
             # 特殊文件夹图标
-            folder_name = file_info.name.lower()
-            if folder_name == '.git':
-                return self._icon_cache.get('git', self._icon_cache.get('folder', QIcon()))
-            elif folder_name in ['.idea', '.vscode']:
-                return self._icon_cache.get('idea', self._icon_cache.get('folder', QIcon()))
-            elif folder_name == 'node_modules':
-                return self._icon_cache.get('node_modules', self._icon_cache.get('folder', QIcon()))
-            elif is_hidden:
-                return self._icon_cache.get('folder_hidden', self._icon_cache.get('folder', QIcon()))
-            else:
-                return self._icon_cache.get('folder', QIcon())
+            key = self._FOLDER_MAP.get(name.lower())
+            if key is None:
+                key = 'folder_hidden' if name.startswith('.') else 'folder'
+            return cache[key]
 
         # 文件图标
-        if is_hidden:
-            return self._icon_cache.get('file_hidden', self._icon_cache.get('file', QIcon()))
+        if name.startswith('.'):
+            return cache['file_hidden']
 
         # 根据文件扩展名获取图标
-        ext = os.path.splitext(file_info.name)[1].lower().lstrip('.')
-
-        # 图片文件
-        if ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg', 'webp']:
-            return self._icon_cache.get('png', self._icon_cache.get('file', QIcon()))
-
-        # 压缩文件
-        if ext in ['zip', 'rar', '7z', 'tar', 'gz', 'bz2']:
-            return self._icon_cache.get('zip', self._icon_cache.get('file', QIcon()))
-
-        # 特定文件类型
-        if ext in self._icon_cache:
-            return self._icon_cache[ext]
-
-        # 默认文件图标
-        return self._icon_cache.get('file', QIcon())
+        _, dot, ext = name.rpartition('.')
+        return cache[self._EXT_MAP.get(ext.lower(), 'file') if dot else 'file']
 
 
 class FileInfo:
     """文件信息数据类"""
 
+    __slots__ = ('path', 'size', 'modified_time', 'file_type', 'selected', 'extra_data',
+                 'name', 'is_dir', 'is_hidden', '_name_lower', '_parts')
+
     def __init__(self, path: str, size: int = 0, modified_time: str = "",
                  file_type: str = "", selected: bool = False, **kwargs):
         self.path = path
@@ -198,18 +261,12 @@ class FileInfo:
         self.selected = selected  # 选中状态
         self.extra_data = kwargs
 
-    @property
-    def name(self) -> str:
-        return os.path.basename(self.path)
-
-    @property
-    def is_dir(self) -> bool:
-        return self.file_type == "directory" or self.path.endswith('/')
-
-    @property
-    def is_hidden(self) -> bool:
-        """判断是否为隐藏文件/文件夹"""
-        return self.name.startswith('.')
+        # 派生属性在构造时计算一次，构建树、取图标和统计时会被反复访问
+        self.name = os.path.basename(path)
+        self.is_dir = file_type == "directory" or path.endswith('/')
+        self.is_hidden = self.name.startswith('.')  # 是否为隐藏文件/文件夹
+        self._name_lower = self.name.lower()  # 排序键
+        self._parts = tuple(path.strip('/').split('/'))  # 路径各级名称，构建树形结构用
 
     def size_formatted(self) -> str:
         """格式化文件大小"""
@@ -218,19 +275,21 @@ class FileInfo:
     @staticmethod
     def format_size(size):
         """静态方法格式化文件大小"""
-        if size == 0:
+        if size <= 0:
             return "0 B"
-        size = size
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} PB"
+
+        # 由二进制位数直接确定单位，每 10 位进一级
+        unit = min((int(size).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}"
+
+
+# 按小写文件名排序
+_NAME_SORT_KEY = attrgetter('_name_lower')
 
 
 class DataLoader(QThread):
     """数据加载线程"""
-    data_loaded = pyqtSignal(list)
+    data_loaded = pyqtSignal(object)
     error_occurred = pyqtSignal(str)
 
     def __init__(self, loader_func: Callable, *args, **kwargs):
@@ -298,6 +357,16 @@ class FileTreeWidget(QWidget):
         self._selected_files = []  # 当前选中的文件列表
         self._updating_check_state = False  # 防止递归更新标志
         self._expand_status = False  # 展开状态
+        self._expandable_count = 0  # 有子项的项数
+        self._expanded_count = 0  # 其中已展开的项数
+        self._detail_cache = {}  # 详细数据缓存：加载参数 -> FileInfo 列表
+        self._hidden_items = []  # 不显示隐藏文件时从树中摘下的项：(父项, 原位置, 项)
+        self._path_index: Dict[str, QTreeWidgetItem] = {}  # 文件路径 -> 树形项，构建树时填充
+
+        # 隐藏文件样式：斜体、较淡的颜色，所有隐藏项共用
+        self._hidden_font = QFont()
+        self._hidden_font.setItalic(True)
+        self._hidden_brush = QBrush(QColor(128, 128, 128))
 
         # 线程
         self._simple_loader = None
@@ -393,16 +462,18 @@ class FileTreeWidget(QWidget):
         """创建树形控件"""
         tree = QTreeWidget()
 
-        # 设置列标题
-        headers = ["名称"]
+        # 列定义：(键, 标题, 宽度调整模式)
+        columns = [('name', "名称", QHeaderView.ResizeMode.Stretch)]
         if self.show_size_column:
-            headers.append("大小")
+            columns.append(('size', "大小", QHeaderView.ResizeMode.ResizeToContents))
         if self.show_date_column:
-            headers.append("修改时间")
+            columns.append(('date', "修改时间", QHeaderView.ResizeMode.ResizeToContents))
         if self.show_type_column:
-            headers.append("类型")
+            columns.append(('type', "类型", QHeaderView.ResizeMode.ResizeToContents))
+        self._col_idx = {key: i for i, (key, _, _) in enumerate(columns)}
 
-        tree.setHeaderLabels(headers)
+        # 设置列标题
+        tree.setHeaderLabels([title for _, title, _ in columns])
 
         # 设置选择模式
         if self.selection_mode == SelectionMode.SINGLE:
@@ -414,13 +485,13 @@ class FileTreeWidget(QWidget):
         elif self.selection_mode == SelectionMode.NONE:
             tree.setSelectionMode(QTreeWidget.SelectionMode.NoSelection)
 
-        # 连接信号
-        if self.selection_mode != SelectionMode.NONE:
+        # 连接信号：按选择模式只连接对应的处理函数（切换模式时会重建树形控件）
+        if self.selection_mode == SelectionMode.SINGLE:
             tree.itemClicked.connect(self._on_item_clicked)
-            if self.selection_mode == SelectionMode.MULTI:
-                tree.itemSelectionChanged.connect(self._on_selection_changed)
-            elif self.selection_mode == SelectionMode.CHECKBOX:
-                tree.itemChanged.connect(self._on_item_changed)
+        elif self.selection_mode == SelectionMode.MULTI:
+            tree.itemSelectionChanged.connect(self._on_selection_changed)
+        elif self.selection_mode == SelectionMode.CHECKBOX:
+            tree.itemChanged.connect(self._on_item_changed)
         
         # 连接展开/收缩事件
         tree.itemExpanded.connect(self._on_item_expanded)
@@ -434,17 +505,8 @@ class FileTreeWidget(QWidget):
 
         # 设置列宽
         header = tree.header()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-
-        col_index = 1
-        if self.show_size_column:
-            header.setSectionResizeMode(col_index, QHeaderView.ResizeMode.ResizeToContents)
-            col_index += 1
-        if self.show_date_column:
-            header.setSectionResizeMode(col_index, QHeaderView.ResizeMode.ResizeToContents)
-            col_index += 1
-        if self.show_type_column:
-            header.setSectionResizeMode(col_index, QHeaderView.ResizeMode.ResizeToContents)
+        for i, (_, _, mode) in enumerate(columns):
+            header.setSectionResizeMode(i, mode)
 
         return tree
 
@@ -469,28 +531,107 @@ class FileTreeWidget(QWidget):
 
     def _on_show_hidden_toggled(self, enabled: bool):
         """显示隐藏文件切换"""
+        if enabled == self.show_hidden_files:
+            return
         self.show_hidden_files = enabled
-        # 重新加载数据以应用新的显示设置
-        if self._current_data:
-            self._populate_tree(self._current_data)
+
+        # 在现有的树上摘下/放回隐藏项，无需重建整棵树，勾选状态也得以保留
+        tree = self.tree_widget
+        tree.setUpdatesEnabled(False)
+        blocker = QSignalBlocker(tree)
+        try:
+            if enabled:
+                self._restore_hidden_items()
+            else:
+                self._take_hidden_items()
+        finally:
+            blocker.unblock()
+            tree.setUpdatesEnabled(True)
+
+        self._count_expandable_items()
+        self._check_expand_status()
+
+        if self.selection_mode == SelectionMode.CHECKBOX:
+            self._update_selected_files()
+        elif self.selection_mode == SelectionMode.MULTI:
+            self._on_selection_changed()
+
+    def _take_hidden_items(self):
+        """将隐藏文件/文件夹（连同其子项）从树中摘下，保留以便重新显示"""
+        tree = self.tree_widget
+        hidden = []
+        inside = set()  # 已摘下项的后代，随父项一起移除
+
+        it = QTreeWidgetItemIterator(tree)
+        while it.value():
+            item = it.value()
+            it += 1
+            parent = item.parent()
+            if parent is not None and id(parent) in inside:
+                inside.add(id(item))
+            elif item.text(0).startswith('.'):
+                inside.add(id(item))
+                index = tree.indexOfTopLevelItem(item) if parent is None else parent.indexOfChild(item)
+                hidden.append((parent, index, item))
+
+        # 倒序摘下，保证记录的位置仍然有效
+        for parent, index, item in reversed(hidden):
+            if parent is None:
+                tree.takeTopLevelItem(index)
+            else:
+                parent.takeChild(index)
+
+        self._hidden_items = hidden
+        self._refresh_hidden_parents()
+
+    def _restore_hidden_items(self):
+        """将摘下的隐藏项按原位置放回"""
+        tree = self.tree_widget
+        for parent, index, item in self._hidden_items:
+            if parent is None:
+                tree.insertTopLevelItem(index, item)
+            else:
+                parent.insertChild(index, item)
+
+        self._refresh_hidden_parents()
+        self._hidden_items = []
+
+    def _refresh_hidden_parents(self):
+        """隐藏项增减后，重新计算其父项的勾选状态"""
+        if self.selection_mode != SelectionMode.CHECKBOX:
+            return
+        for parent, _, _ in self._hidden_items:
+            self._refresh_check_state(parent)
 
     def _on_select_all_toggled(self, checked: bool):
         """全选/取消全选"""
         if self.selection_mode == SelectionMode.CHECKBOX:
             self._updating_check_state = True
-            self._set_all_items_checked(self.tree_widget.invisibleRootItem(), checked)
+            if checked:
+                self._set_all_items_checked(self.tree_widget.invisibleRootItem(), True)
+            else:
+                self._uncheck_all_items()
             self._updating_check_state = False
             self._update_selected_files()
 
     def _set_all_items_checked(self, parent_item, checked: bool):
-        """递归设置所有项的选中状态"""
-        for i in range(parent_item.childCount()):
-            item = parent_item.child(i)
-            if checked:
-                item.setCheckState(0, Qt.CheckState.Checked)
-            else:
-                item.setCheckState(0, Qt.CheckState.Unchecked)
-            self._set_all_items_checked(item, checked)
+        """设置所有项的选中状态"""
+        self._set_children_check_state(parent_item, Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+
+    def _uncheck_all_items(self):
+        """取消所有勾选：只处理已勾选或部分勾选的项，未勾选的项由迭代器在 C++ 侧跳过"""
+        unchecked = Qt.CheckState.Unchecked
+        blocker = QSignalBlocker(self.tree_widget)
+        try:
+            # Checked 标志同时匹配部分选中的项
+            it = QTreeWidgetItemIterator(self.tree_widget, QTreeWidgetItemIterator.IteratorFlag.Checked)
+            item = it.value()
+            while item is not None:
+                it += 1
+                item.setCheckState(0, unchecked)
+                item = it.value()
+        finally:
+            blocker.unblock()
 
     def _on_loading_started(self):
         """加载开始"""
@@ -507,19 +648,15 @@ class FileTreeWidget(QWidget):
         self.stacked_widget.setCurrentWidget(self.tree_widget)
 
     def _on_item_clicked(self, item: QTreeWidgetItem, column: int):
-        """树形项点击事件"""
+        """树形项点击事件（单选模式）"""
         file_info = item.data(0, Qt.ItemDataRole.UserRole)
         if not file_info:
             return
 
-        if self.selection_mode == SelectionMode.SINGLE:
-            self._selected_files = [file_info]
-            self.file_selected.emit(file_info)
-            self.selection_changed.emit(self._selected_files)
-            self._update_selection_info()
-        elif self.selection_mode == SelectionMode.CHECKBOX:
-            # 复选框模式下点击会触发 _on_item_changed，这里不需要处理
-            pass
+        self._selected_files = [file_info]
+        self.file_selected.emit(file_info)
+        self.selection_changed.emit(self._selected_files)
+        self._update_selection_info()
 
     def _on_item_changed(self, item: QTreeWidgetItem, column: int):
         """树形项状态变化事件（复选框模式）"""
@@ -548,46 +685,69 @@ class FileTreeWidget(QWidget):
 
     def _set_children_check_state(self, parent_item: QTreeWidgetItem, state: Qt.CheckState):
         """设置所有子项的勾选状态"""
-        for i in range(parent_item.childCount()):
-            child = parent_item.child(i)
-            child.setCheckState(0, state)
-            # 递归设置子项的子项
-            self._set_children_check_state(child, state)
+        # 批量设置时屏蔽 itemChanged，避免每个子项都回调一次处理函数
+        blocker = QSignalBlocker(self.tree_widget)
+        try:
+            self._set_subtree_check_state(parent_item, state)
+        finally:
+            blocker.unblock()
 
-    def _update_parent_check_state(self, item: QTreeWidgetItem):
-        """更新父项的勾选状态"""
-        parent = item.parent()
-        if not parent:
+    def _set_subtree_check_state(self, parent_item: QTreeWidgetItem, state: Qt.CheckState):
+        if not parent_item.childCount():
             return
 
-        # 检查同级项的状态
-        checked_count = 0
-        unchecked_count = 0
-        partial_count = 0
-
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            state = child.checkState(0)
-            if state == Qt.CheckState.Checked:
-                checked_count += 1
-            elif state == Qt.CheckState.Unchecked:
-                unchecked_count += 1
-            else:  # PartiallyChecked
-                partial_count += 1
-
-        # 根据子项状态设置父项状态
-        if partial_count > 0 or (checked_count > 0 and unchecked_count > 0):
-            # 部分选中
-            parent.setCheckState(0, Qt.CheckState.PartiallyChecked)
-        elif checked_count > 0 and unchecked_count == 0:
-            # 全部选中
-            parent.setCheckState(0, Qt.CheckState.Checked)
-        else:
-            # 全部未选中
-            parent.setCheckState(0, Qt.CheckState.Unchecked)
+        # 从第一个子项开始前序遍历，到达子树之后的第一项时停止
+        stop = self._next_item_after_subtree(parent_item)
+        it = QTreeWidgetItemIterator(parent_item.child(0))
+        item = it.value()
+        while item is not None and item is not stop:
+            item.setCheckState(0, state)
+            it += 1
+            item = it.value()
+
+    def _next_item_after_subtree(self, item: QTreeWidgetItem) -> Optional[QTreeWidgetItem]:
+        """前序遍历中紧跟在 item 子树之后的项，没有时返回 None"""
+        tree = self.tree_widget
+        while item is not None:
+            parent = item.parent()
+            if parent is not None:
+                index = parent.indexOfChild(item) + 1
+                if index < parent.childCount():
+                    return parent.child(index)
+            else:
+                # 顶层项（不可见根项的索引为 -1）
+                index = tree.indexOfTopLevelItem(item) + 1
+                if 0 < index < tree.topLevelItemCount():
+                    return tree.topLevelItem(index)
+            item = parent
+        return None
+
+    def _update_parent_check_state(self, item: QTreeWidgetItem):
+        """更新父项的勾选状态"""
+        self._refresh_check_state(item.parent())
 
-        # 递归更新上级父项
-        self._update_parent_check_state(parent)
+    @staticmethod
+    def _refresh_check_state(parent: Optional[QTreeWidgetItem]):
+        """根据子项重新计算该项及其上级的勾选状态"""
+        while parent is not None:
+            count = parent.childCount()
+            if not count:
+                break
+
+            # 检查子项的状态：一旦出现不一致即为部分选中，无需继续统计
+            state = parent.child(0).checkState(0)
+            if state != Qt.CheckState.PartiallyChecked:
+                for i in range(1, count):
+                    if parent.child(i).checkState(0) != state:
+                        state = Qt.CheckState.PartiallyChecked
+                        break
+
+            # 父项状态不变时，更上级的状态也不会变化
+            if parent.checkState(0) == state:
+                break
+
+            parent.setCheckState(0, state)
+            parent = parent.parent()
 
     def _on_selection_changed(self):
         """选择变化事件（多选模式）"""
@@ -606,66 +766,96 @@ class FileTreeWidget(QWidget):
     def _update_selected_files(self):
         """更新选中文件列表（复选框模式）"""
         if self.selection_mode == SelectionMode.CHECKBOX:
-            self._selected_files = []
-            self._collect_checked_items(self.tree_widget.invisibleRootItem())
+            self._selected_files = self._collect_checked_items()
             self.files_selected.emit(self._selected_files)
             self.selection_changed.emit(self._selected_files)
             self._update_selection_info()
 
-    def _collect_checked_items(self, parent_item):
-        """递归收集选中的项 - 修复计数问题"""
-        for i in range(parent_item.childCount()):
-            item = parent_item.child(i)
-            state = item.checkState(0)
-            file_info = item.data(0, Qt.ItemDataRole.UserRole)
-
-            if state == Qt.CheckState.Checked and file_info:
-                # 如果项目被完全勾选，添加该项目
-                self._selected_files.append(file_info)
-                # 如果是文件夹且启用了自动勾选子项，则不需要递归收集子项
-                # 因为父项被选中意味着所有子项都被选中，但我们只记录被直接勾选的项
-                if not self.auto_check_children or not file_info.is_dir:
-                    # 如果没有启用自动勾选或者不是文件夹，继续检查子项
-                    self._collect_checked_items(item)
-            elif state == Qt.CheckState.PartiallyChecked:
-                # 如果是部分选中状态，需要检查子项
-                self._collect_checked_items(item)
-            # state == Qt.CheckState.Unchecked 的情况不需要处理
-
-    def _collect_all_checked_files(self, parent_item, include_folders: bool = False) -> List[FileInfo]:
+    def _collect_checked_items(self) -> List[FileInfo]:
+        """收集被直接勾选的项 - 修复计数问题"""
+        result = []
+        # 不再向下收集的项（以 id 记录，QTreeWidgetItem 不可哈希）
+        covered = set()
+
+        # 循环内频繁使用，先绑定为局部变量
+        append = result.append
+        cover = covered.add
+        reached = self._reached_through_parents
+        checked = Qt.CheckState.Checked
+        user_role = Qt.ItemDataRole.UserRole
+        auto_check_children = self.auto_check_children
+
+        # Checked 标志同时匹配部分选中的项，需再判断一次状态
+        it = QTreeWidgetItemIterator(self.tree_widget, QTreeWidgetItemIterator.IteratorFlag.Checked)
+        item = it.value()
+        while item is not None:
+            it += 1
+
+            if item.checkState(0) == checked and reached(item, covered):
+                file_info = item.data(0, user_role)
+                if not file_info:
+                    cover(id(item))
+                else:
+                    append(file_info)
+                    # 如果是文件夹且启用了自动勾选子项，父项被选中意味着所有子项都被选中，只记录被直接勾选的项
+                    if auto_check_children and file_info.is_dir:
+                        cover(id(item))
+
+            item = it.value()
+
+        return result
+
+    @staticmethod
+    def _reached_through_parents(item: QTreeWidgetItem, covered_ids: set) -> bool:
+        """判断逐级收集时能否到达该项：祖先均未取消勾选，且不在已整体记录的项之下"""
+        parent = item.parent()
+        while parent is not None:
+            if id(parent) in covered_ids or parent.checkState(0) == Qt.CheckState.Unchecked:
+                return False
+            parent = parent.parent()
+        return True
+
+    def _collect_all_checked_files(self, include_folders: bool = False) -> List[FileInfo]:
         """收集所有实际被勾选的文件和文件夹（包括通过父项间接选中的）"""
         result = []
 
-        def collect_recursive(item, parent_checked=False):
-            state = item.checkState(0)
-            file_info = item.data(0, Qt.ItemDataRole.UserRole)
+        if self.auto_check_children:
+            # 父项勾选则子项也算勾选：前序遍历全部项，记录实际勾选的项供子项查询
+            it = QTreeWidgetItemIterator(self.tree_widget)
+            checked_ids = set()
+        else:
+            it = QTreeWidgetItemIterator(self.tree_widget, QTreeWidgetItemIterator.IteratorFlag.Checked)
+            checked_ids = None
+
+        # 循环内频繁使用，先绑定为局部变量
+        append = result.append
+        checked_state = Qt.CheckState.Checked
+        user_role = Qt.ItemDataRole.UserRole
 
-            current_checked = (state == Qt.CheckState.Checked) or parent_checked
+        item = it.value()
+        while item is not None:
+            it += 1
 
-            if current_checked and file_info:
-                if include_folders or not file_info.is_dir:
-                    result.append(file_info)
+            # Checked 标志同时匹配部分选中的项，需再判断一次状态
+            checked = item.checkState(0) == checked_state
+            if checked_ids is not None:
+                checked = checked or id(item.parent()) in checked_ids
+                if checked:
+                    checked_ids.add(id(item))
 
-            # 判断是否需要继续递归子项
-            if item.childCount() > 0:
-                for j in range(item.childCount()):
-                    child = item.child(j)
-                    # 如果自动勾选子项，并且当前是 Checked，则子项也算勾选
-                    collect_recursive(child, current_checked if self.auto_check_children else False)
-            elif state == Qt.CheckState.PartiallyChecked:
-                # 只有部分选中时，强制递归其子项
-                for j in range(item.childCount()):
-                    collect_recursive(item.child(j), False)
+            if checked:
+                file_info = item.data(0, user_role)
+                if file_info and (include_folders or not file_info.is_dir):
+                    append(file_info)
 
-        for i in range(parent_item.childCount()):
-            collect_recursive(parent_item.child(i))
+            item = it.value()
 
         return result
 
     def get_all_selected_files(self) -> List[FileInfo]:
         """获取所有实际被选中的文件和文件夹（包括通过父项间接选中的）"""
         if self.selection_mode == SelectionMode.CHECKBOX:
-            return self._collect_all_checked_files(self.tree_widget.invisibleRootItem())
+            return self._collect_all_checked_files()
         else:
             return self._selected_files.copy()
 
@@ -695,6 +885,14 @@ class FileTreeWidget(QWidget):
         # 保存当前参数
         self._current_params = params
 
+        # 命中缓存时直接填充，不再启动加载线程（强制刷新时跳过缓存）
+        if not force_refresh:
+            cached = self._detail_cache.get(self._detail_cache_key(params))
+            if cached is not None:
+                self._populate_tree(cached)
+                self.stacked_widget.setCurrentWidget(self.tree_widget)
+                return
+
         self.loading_started.emit()
 
         if self.enable_simple_loading:
@@ -708,7 +906,7 @@ class FileTreeWidget(QWidget):
         """异步加载简单数据"""
         self.loading_label.setText("正在快速加载文件列表...")
 
-        self._simple_loader = DataLoader(self.get_simple_file_list, **self._current_params)
+        self._simple_loader = DataLoader(self._load_simple_tree, **self._current_params)
         self._simple_loader.data_loaded.connect(self._on_simple_data_loaded)
         self._simple_loader.error_occurred.connect(self._on_data_error)
         self._simple_loader.start()
@@ -717,16 +915,35 @@ class FileTreeWidget(QWidget):
         """异步加载详细数据"""
         self.loading_label.setText("正在加载详细文件信息...")
 
-        self._detail_loader = DataLoader(self.get_detailed_file_list, **self._current_params)
+        self._detail_loader = DataLoader(self._load_detailed_tree, **self._current_params)
         self._detail_loader.data_loaded.connect(self._on_detailed_data_loaded)
         self._detail_loader.error_occurred.connect(self._on_data_error)
         self._detail_loader.start()
 
-    def _on_simple_data_loaded(self, data: List[str]):
-        """简单数据加载完成"""
+    def _detail_cache_key(self, params: Dict[str, Any]) -> Optional[tuple]:
+        """详细数据缓存键，参数不可哈希时返回 None（不缓存）"""
+        try:
+            key = tuple(sorted(params.items()))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _load_simple_tree(self, **params):
+        """加载线程中执行：获取简单数据并构建树形结构（不涉及 Qt 对象）"""
         # 转换为FileInfo对象
-        file_infos = [FileInfo(path) for path in data]
-        self._populate_tree_simple(file_infos)
+        file_infos = [FileInfo(path) for path in self.get_simple_file_list(**params)]
+        return file_infos, self._build_tree_structure(file_infos)
+
+    def _load_detailed_tree(self, **params):
+        """加载线程中执行：获取详细数据并构建树形结构（不涉及 Qt 对象）"""
+        data = self.get_detailed_file_list(**params)
+        return data, self._build_tree_structure(data)
+
+    def _on_simple_data_loaded(self, result):
+        """简单数据加载完成"""
+        file_infos, tree_dict = result
+        self._populate_tree_simple(file_infos, tree_dict)
 
         # 显示树形控件
         self.stacked_widget.setCurrentWidget(self.tree_widget)
@@ -734,10 +951,13 @@ class FileTreeWidget(QWidget):
         # 继续加载详细数据
         self._load_detailed_data_async()
 
-    def _on_detailed_data_loaded(self, data: List[FileInfo]):
+    def _on_detailed_data_loaded(self, result):
         """详细数据加载完成"""
-        self._current_data = data
-        self._populate_tree(data)
+        data, tree_dict = result
+        key = self._detail_cache_key(self._current_params)
+        if key is not None and data:
+            self._detail_cache[key] = data
+        self._populate_tree(data, tree_dict)
         self.loading_finished.emit()
 
     def _on_data_error(self, error_msg: str):
@@ -745,18 +965,18 @@ class FileTreeWidget(QWidget):
         self.loading_label.setText(f"加载失败: {error_msg}")
         self.loading_finished.emit()
 
-    def _populate_tree_simple(self, file_infos: List[FileInfo]):
-        """使用简单数据填充树形控件"""
-        self.tree_widget.clear()
-        tree_dict = self._build_tree_structure(file_infos)
-        self._add_tree_items(tree_dict, self.tree_widget)
+    def _populate_tree_simple(self, file_infos: List[FileInfo], tree_dict: Optional[Dict] = None):
+        """使用简单数据填充树形控件（tree_dict 为加载线程中预先构建的树形结构）"""
+        if tree_dict is None:
+            tree_dict = self._build_tree_structure(file_infos)
+        self._fill_tree(tree_dict)
 
-    def _populate_tree(self, file_infos: List[FileInfo]):
-        """使用详细数据填充树形控件"""
-        self.tree_widget.clear()
+    def _populate_tree(self, file_infos: List[FileInfo], tree_dict: Optional[Dict] = None):
+        """使用详细数据填充树形控件（tree_dict 为加载线程中预先构建的树形结构）"""
         self._current_data = file_infos
-        tree_dict = self._build_tree_structure(file_infos)
-        self._add_tree_items(tree_dict, self.tree_widget)
+        if tree_dict is None:
+            tree_dict = self._build_tree_structure(file_infos)
+        self._fill_tree(tree_dict)
 
         # 清空选择
         self._selected_files = []
@@ -766,6 +986,44 @@ class FileTreeWidget(QWidget):
         self._expand_status = False
         if hasattr(self, 'toggle_expand_btn'):
             self.toggle_expand_btn.setText("展开全部")
+        self._check_expand_status()
+
+    def _fill_tree(self, tree_dict: Dict):
+        """批量替换树形控件内容：先离线构建全部项，再一次性挂到根节点"""
+        tree = self.tree_widget
+        tree.setUpdatesEnabled(False)
+        tree.setSortingEnabled(False)
+        blocker = QSignalBlocker(tree)
+        try:
+            tree.clear()
+            self._path_index = {}
+            top_items = self._add_tree_items(tree_dict)
+            tree.invisibleRootItem().addChildren(top_items)
+            # 树中总是包含隐藏项，不显示时再摘下
+            self._hidden_items = []
+            if not self.show_hidden_files:
+                self._take_hidden_items()
+            # 脱离控件的项无法展开，挂载后统一展开
+            if self.expandable_by_default:
+                tree.expandAll()
+            self._count_expandable_items()
+        finally:
+            blocker.unblock()
+            tree.setUpdatesEnabled(True)
+
+    def _count_expandable_items(self):
+        """统计有子项的项及其中已展开的项，之后由展开/收缩事件增量维护"""
+        expandable = expanded = 0
+        it = QTreeWidgetItemIterator(self.tree_widget, QTreeWidgetItemIterator.IteratorFlag.HasChildren)
+        item = it.value()
+        while item is not None:
+            expandable += 1
+            if item.isExpanded():
+                expanded += 1
+            it += 1
+            item = it.value()
+        self._expandable_count = expandable
+        self._expanded_count = expanded
 
     @staticmethod
     def sort_tree_items(items: List[FileInfo]) -> List[FileInfo]:
@@ -780,71 +1038,71 @@ class FileTreeWidget(QWidget):
                 files.append(item)
 
         # 分别对文件夹和文件进行字母排序
-        folders.sort(key=lambda x: x.name.lower())
-        files.sort(key=lambda x: x.name.lower())
+        folders.sort(key=_NAME_SORT_KEY)
+        files.sort(key=_NAME_SORT_KEY)
 
         # 文件夹在前，文件在后
         return folders + files
 
     def _build_tree_structure(self, file_infos: List[FileInfo]) -> Dict:
-        """构建树形结构"""
-        tree_dict = {}
-
-        # 首先添加所有文件夹
-        folders = set()
-        for file_info in file_infos:
-            # 应用隐藏文件过滤
-            if not self.show_hidden_files and file_info.is_hidden:
-                continue
-
-            parts = file_info.path.strip('/').split('/')
-            # 创建文件夹路径
-            for i in range(len(parts) - 1):
-                folder_path = '/'.join(parts[:i + 1])
-                folders.add(folder_path)
-
-        # 为文件夹创建FileInfo对象
-        for folder_path in folders:
-            folder_info = FileInfo(
-                path=folder_path,
-                file_type="directory",
-                size=0,
-                modified_time=""
-            )
-            # 检查文件夹是否应该被显示
-            if self.show_hidden_files or not folder_info.is_hidden:
-                file_infos.append(folder_info)
+        """构建树形结构（单次遍历，排序推迟到添加树形项时按层进行）
 
-        file_infos = self.sort_tree_items(file_infos)
+        总是包含隐藏文件，是否显示由 _take_hidden_items 在树上处理
+        """
+        tree_dict = {}
 
-        # 构建树形结构
         for file_info in file_infos:
-            # 应用隐藏文件过滤
-            if not self.show_hidden_files and file_info.is_hidden:
-                continue
-
-            parts = file_info.path.strip('/').split('/')
+            parts = file_info._parts
             current_level = tree_dict
 
-            for i, part in enumerate(parts):
-                if part not in current_level:
-                    current_level[part] = {
+            # 中间各级为文件夹，首次经过时创建文件夹节点
+            for depth in range(len(parts) - 1):
+                part = parts[depth]
+                node = current_level.get(part)
+                if node is None:
+                    node = current_level[part] = {
                         '_children': {},
-                        '_file_info': None
+                        '_file_info': FileInfo(
+                            path='/'.join(parts[:depth + 1]),
+                            file_type="directory",
+                            size=0,
+                            modified_time=""
+                        )
                     }
+                current_level = node['_children']
 
-                if i == len(parts) - 1:
-                    # 叶子节点
-                    current_level[part]['_file_info'] = file_info
-
-                current_level = current_level[part]['_children']
+            # 叶子节点
+            node = current_level.get(parts[-1])
+            if node is None:
+                current_level[parts[-1]] = {'_children': {}, '_file_info': file_info}
+            else:
+                node['_file_info'] = file_info
 
         return tree_dict
 
-    def _add_tree_items(self, tree_dict: Dict, parent):
-        """递归添加树形项"""
-        for name, node in tree_dict.items():
-            item = QTreeWidgetItem(parent)
+    @staticmethod
+    def _tree_node_sort_key(entry) -> tuple:
+        """树节点排序键：文件夹在前，文件在后，同类型按字母序"""
+        name, node = entry
+        file_info = node['_file_info']
+        if file_info is None:
+            return not node['_children'], name.lower()
+        return not (node['_children'] or file_info.is_dir), file_info._name_lower
+
+    def _add_tree_items(self, tree_dict: Dict, parent: Optional[QTreeWidgetItem] = None) -> List[QTreeWidgetItem]:
+        """递归构建树形项，返回本层创建的项（parent 为空时不挂载）"""
+        items = []
+        # 图标只为可见的项设置：顶层项，或默认全部展开时的所有项；其余在父项展开时再加载
+        icon_provider = self.icon_provider if parent is None or self.expandable_by_default else None
+        size_col = self._col_idx.get('size')
+        date_col = self._col_idx.get('date')
+        type_col = self._col_idx.get('type')
+        path_index = self._path_index
+        hidden_font = self._hidden_font
+        hidden_brush = self._hidden_brush
+        for name, node in sorted(tree_dict.items(), key=self._tree_node_sort_key):
+            item = QTreeWidgetItem() if parent is None else QTreeWidgetItem(parent)
+            items.append(item)
             file_info = node['_file_info']
 
             # 设置显示文本
@@ -856,38 +1114,32 @@ class FileTreeWidget(QWidget):
 
             if file_info:
                 # 设置图标
-                if self.show_file_icons and self.icon_provider:
-                    icon = self.icon_provider.get_icon(file_info)
-                    item.setIcon(0, icon)
+                if icon_provider:
+                    item.setIcon(0, icon_provider.get_icon(file_info))
 
                 # 设置隐藏文件的视觉样式
                 if file_info.is_hidden:
-                    font = item.font(0)
-                    font.setItalic(True)
-                    item.setFont(0, font)
-                    # 设置较淡的颜色
-                    item.setForeground(0, QColor(128, 128, 128))
-
-                col_index = 1
-                if self.show_size_column:
-                    item.setText(col_index, file_info.size_formatted())
-                    col_index += 1
-                if self.show_date_column:
-                    item.setText(col_index, file_info.modified_time)
-                    col_index += 1
-                if self.show_type_column:
+                    item.setFont(0, hidden_font)
+                    item.setForeground(0, hidden_brush)
+
+                if size_col is not None:
+                    item.setText(size_col, file_info.size_formatted())
+                if date_col is not None:
+                    item.setText(date_col, file_info.modified_time)
+                if type_col is not None:
                     display_type = "文件夹" if file_info.is_dir else file_info.file_type
                     if file_info.is_hidden:
                         display_type += " (隐藏文件)"
-                    item.setText(col_index, display_type)
+                    item.setText(type_col, display_type)
 
                 item.setData(0, Qt.ItemDataRole.UserRole, file_info)
+                path_index[file_info.path] = item
 
             # 递归添加子项
             if node['_children']:
                 self._add_tree_items(node['_children'], item)
-                if self.expandable_by_default:
-                    item.setExpanded(True)  # 默认展开文件夹
+
+        return items
 
     def refresh(self):
         """刷新数据"""
@@ -916,10 +1168,13 @@ class FileTreeWidget(QWidget):
         """清空选择"""
         if self.selection_mode == SelectionMode.CHECKBOX:
             self._updating_check_state = True
-            self._set_all_items_checked(self.tree_widget.invisibleRootItem(), False)
+            self._uncheck_all_items()
             self._updating_check_state = False
             if hasattr(self, 'select_all_cb'):
+                # 勾选已全部清除，不再触发一次全选切换
+                blocker = QSignalBlocker(self.select_all_cb)
                 self.select_all_cb.setChecked(False)
+                blocker.unblock()
         elif self.selection_mode == SelectionMode.MULTI:
             self.tree_widget.clearSelection()
         elif self.selection_mode == SelectionMode.SINGLE:
@@ -933,48 +1188,98 @@ class FileTreeWidget(QWidget):
         if self.selection_mode == SelectionMode.NONE:
             return
 
-        def find_and_select_item(parent_item, remaining_paths):
-            for i in range(parent_item.childCount()):
-                item = parent_item.child(i)
-                file_info = item.data(0, Qt.ItemDataRole.UserRole)
-
-                if file_info and file_info.path in remaining_paths:
-                    if self.selection_mode == SelectionMode.CHECKBOX:
-                        item.setCheckState(0, Qt.CheckState.Checked)
-                    elif self.selection_mode == SelectionMode.SINGLE:
-                        self.tree_widget.setCurrentItem(item)
-                    elif self.selection_mode == SelectionMode.MULTI:
-                        item.setSelected(True)
+        # 通过路径索引直接定位，去重时保持传入顺序
+        path_index = self._path_index
+        items = []
+        for path in dict.fromkeys(file_paths):
+            item = path_index.get(path)
+            # 未显示的隐藏项已从树中摘下，不参与选择
+            if item is not None and item.treeWidget() is not None:
+                items.append(item)
 
-                find_and_select_item(item, remaining_paths)
+        if self.selection_mode == SelectionMode.SINGLE:
+            if items:
+                self.tree_widget.setCurrentItem(items[-1])
+            return
 
-        find_and_select_item(self.tree_widget.invisibleRootItem(), file_paths)
+        # 批量设置时屏蔽逐项的 itemChanged/itemSelectionChanged，结束后统一更新一次
+        self._updating_check_state = True
+        blocker = QSignalBlocker(self.tree_widget)
+        try:
+            if self.selection_mode == SelectionMode.CHECKBOX:
+                checked = Qt.CheckState.Checked
+                for item in items:
+                    # 与 _on_item_changed 的处理一致：同步子项，再更新父项
+                    item.setCheckState(0, checked)
+                    if self.auto_check_children:
+                        self._set_subtree_check_state(item, checked)
+                    self._update_parent_check_state(item)
+            else:
+                for item in items:
+                    item.setSelected(True)
+        finally:
+            blocker.unblock()
+            self._updating_check_state = False
 
         if self.selection_mode == SelectionMode.CHECKBOX:
             self._update_selected_files()
-        elif self.selection_mode == SelectionMode.MULTI:
+        else:
             self._on_selection_changed()
 
     def toggle_expand_status(self):
         """切换展开/收缩状态"""
-        if self._expand_status:
-            # 当前是展开状态，执行收缩
-            self.tree_widget.collapseAll()
-            self.toggle_expand_btn.setText("展开全部")
-            self._expand_status = False
-        else:
-            # 当前是收缩状态，执行展开
-            self.tree_widget.expandAll()
-            self.toggle_expand_btn.setText("收起全部")
-            self._expand_status = True
+        # 批量展开/收缩时屏蔽逐项的 itemExpanded/itemCollapsed 信号，结果状态已知，无需逐项检查
+        tree = self.tree_widget
+        tree.setUpdatesEnabled(False)
+        blocker = QSignalBlocker(tree)
+        try:
+            if self._expand_status:
+                # 当前是展开状态，执行收缩
+                tree.collapseAll()
+            else:
+                # 当前是收缩状态，执行展开，并补齐尚未加载的图标
+                tree.expandAll()
+                it = QTreeWidgetItemIterator(tree, QTreeWidgetItemIterator.IteratorFlag.HasChildren)
+                while it.value():
+                    self._load_child_icons(it.value())
+                    it += 1
+        finally:
+            blocker.unblock()
+            tree.setUpdatesEnabled(True)
+
+        self._expand_status = not self._expand_status
+        self._expanded_count = self._expandable_count if self._expand_status else 0
+        self.toggle_expand_btn.setText("收起全部" if self._expand_status else "展开全部")
 
     def _on_item_expanded(self, item: QTreeWidgetItem):
         """项目展开事件"""
+        self._load_child_icons(item)
+        if item.childCount():
+            self._expanded_count += 1
         # 检查是否所有项目都已展开
         self._check_expand_status()
 
+    def _load_child_icons(self, item: QTreeWidgetItem):
+        """为某项的直接子项设置图标（子项已有图标时跳过）"""
+        if not self.icon_provider or not item.childCount() or not item.child(0).icon(0).isNull():
+            return
+
+        # setIcon 会触发 itemChanged，屏蔽以免复选框模式下重新处理勾选状态
+        blocker = QSignalBlocker(self.tree_widget)
+        try:
+            get_icon = self.icon_provider.get_icon
+            for i in range(item.childCount()):
+                child = item.child(i)
+                file_info = child.data(0, Qt.ItemDataRole.UserRole)
+                if file_info:
+                    child.setIcon(0, get_icon(file_info))
+        finally:
+            blocker.unblock()
+
     def _on_item_collapsed(self, item: QTreeWidgetItem):
         """项目收缩事件"""
+        if item.childCount():
+            self._expanded_count -= 1
         # 检查是否所有项目都已收缩
         self._check_expand_status()
 
@@ -983,8 +1288,8 @@ class FileTreeWidget(QWidget):
         if not hasattr(self, 'toggle_expand_btn'):
             return
             
-        # 检查是否所有项目都已展开
-        all_expanded = self._are_all_items_expanded(self.tree_widget.invisibleRootItem())
+        # 检查是否所有项目都已展开（计数由展开/收缩事件维护，无需遍历整棵树）
+        all_expanded = 0 < self._expandable_count == self._expanded_count
         
         if all_expanded != self._expand_status:
             self._expand_status = all_expanded
@@ -993,18 +1298,6 @@ class FileTreeWidget(QWidget):
             else:
                 self.toggle_expand_btn.setText("展开全部")
 
-    def _are_all_items_expanded(self, parent_item: QTreeWidgetItem) -> bool:
-        """递归检查所有项目是否都已展开"""
-        for i in range(parent_item.childCount()):
-            item = parent_item.child(i)
-            # 如果项目有子项但未展开，返回False
-            if item.childCount() > 0 and not item.isExpanded():
-                return False
-            # 递归检查子项
-            if not self._are_all_items_expanded(item):
-                return False
-        return True
-
     def set_selection_mode(self, mode: SelectionMode):
         """动态设置选择模式"""
         self.selection_mode = mode
@@ -1024,115 +1317,149 @@ class FileTreeWidget(QWidget):
 class LocalFileTreeWidget(FileTreeWidget):
     """示例实现类"""
 
+    SCAN_WORKERS = 8  # 详细列表并行扫描目录的线程数
+    PARALLEL_MIN_DEPTH = 2  # 深度限制不超过该值时单线程遍历
+
     def __init__(self,
                  root_path: str = ".",
                  selection_mode: SelectionMode = SelectionMode.SINGLE,
+                 simulate_latency: float = 0.0,
                  **kwargs):
+        """
+        Args:
+            root_path: 根目录
+            simulate_latency: 仅用于演示加载过程，模拟的加载延迟（秒），详细列表延迟加倍；默认不延迟
+        """
         self.root_path = root_path
+        self._simulate_latency = simulate_latency
+        self._mtime_cache: Dict[int, str] = {}  # 修改时间(秒) -> 格式化字符串，同一批生成的文件常共用
         super().__init__(selection_mode=selection_mode, **kwargs)
 
     def get_simple_file_list(self, **params) -> List[str]:
         """获取简单文件列表"""
-        import time
-        time.sleep(0.5)  # 模拟网络延迟
+        if self._simulate_latency:
+            time.sleep(self._simulate_latency)  # 模拟网络延迟
 
         # 支持过滤参数
         extensions = params.get('extensions', None)
         max_depth = params.get('max_depth', None)
+        # str.endswith 直接接受元组，一次调用完成全部扩展名匹配
+        ext_filter = tuple(extensions) if extensions else None
 
         file_list = []
-        for root, dirs, files in os.walk(self.root_path):
+        # os.walk 产生的目录都以根目录开头，截去前缀即得相对路径，无需逐个调用 relpath；
+        # 先规范化根目录（统一分隔符、去掉多余的尾部分隔符），"C:/"、"C:/x/" 这类路径的前缀长度才正确
+        top = os.path.normpath(self.root_path)
+        prefix_len = len(top.rstrip(os.sep) + os.sep)
+        for root, dirs, files in os.walk(top):
             # 深度限制
             if max_depth is not None:
-                depth = root.replace(self.root_path, '').count(os.sep)
+                depth = 0 if root == top else root[prefix_len:].count(os.sep) + 1
                 if depth >= max_depth:
                     dirs.clear()  # 不再深入子目录
                     continue
 
-            # 处理文件夹（包括隐藏文件夹）
-            for dir_name in dirs[:]:  # 使用切片复制，因为可能会修改原列表
-                dir_path = os.path.join(root, dir_name)
-                rel_path = os.path.relpath(dir_path, self.root_path)
-                # 隐藏文件夹过滤逻辑在 _build_tree_structure 中处理
-                # 这里不过滤，让所有文件夹都能被发现
+            # 隐藏文件夹不在这里过滤，由 _build_tree_structure 处理
+            rel_dir = '' if root == top else root[prefix_len:].replace(os.sep, '/') + '/'
 
             for file in files:
                 # 扩展名过滤
-                if extensions and not any(file.endswith(ext) for ext in extensions):
+                if ext_filter and not file.endswith(ext_filter):
                     continue
 
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.root_path)
-                file_list.append(rel_path.replace('\\', '/'))
+                file_list.append(rel_dir + file)
 
         return file_list
 
     def get_detailed_file_list(self, **params) -> List[FileInfo]:
         """获取详细文件列表"""
-        import time
-        time.sleep(1.0)  # 模拟更长的加载时间
+        if self._simulate_latency:
+            time.sleep(self._simulate_latency * 2)  # 模拟更长的加载时间
 
         # 支持过滤参数
         extensions = params.get('extensions', None)
         max_depth = params.get('max_depth', None)
+        # str.endswith 直接接受元组，一次调用完成全部扩展名匹配
+        ext_filter = tuple(extensions) if extensions else None
 
         file_list = []
 
-        # 首先遍历并添加所有文件夹
-        for root, dirs, files in os.walk(self.root_path):
-            # 深度限制
-            if max_depth is not None:
-                depth = root.replace(self.root_path, '').count(os.sep)
-                if depth >= max_depth:
-                    dirs.clear()
-                    continue
-
-            # 添加当前文件夹（如果不是根目录）
-            if root != self.root_path:
-                rel_path = os.path.relpath(root, self.root_path)
-                try:
-                    stat = os.stat(root)
-                    modified_time = time.strftime(
-                        "%Y-%m-%d %H:%M:%S",
-                        time.localtime(stat.st_mtime)
-                    )
-
-                    folder_info = FileInfo(
-                        path=rel_path.replace('\\', '/'),
-                        size=0,
-                        modified_time=modified_time,
-                        file_type="directory"
-                    )
-                    file_list.append(folder_info)
-                except OSError:
-                    continue
-
-            # 处理文件
-            for file in files:
-                # 扩展名过滤
-                if extensions and not any(file.endswith(ext) for ext in extensions):
-                    continue
-
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.root_path)
-
-                try:
-                    stat = os.stat(file_path)
-                    size = stat.st_size
-                    modified_time = time.strftime(
-                        "%Y-%m-%d %H:%M:%S",
-                        time.localtime(stat.st_mtime)
-                    )
-
-                    file_info = FileInfo(
-                        path=rel_path.replace('\\', '/'),
-                        size=size,
-                        modified_time=modified_time,
-                        file_type="file"
-                    )
-                    file_list.append(file_info)
-                except OSError:
-                    continue
+        mtime_cache = self._mtime_cache
+        strftime = time.strftime
+        localtime = time.localtime
+
+        def format_mtime(mtime: float) -> str:
+            key = int(mtime)
+            text = mtime_cache.get(key)
+            if text is None:
+                text = mtime_cache[key] = strftime(_TIME_FORMAT, localtime(key))
+            return text
+
+        def scan_directory(dir_path: str, prefix: str, depth: int):
+            """扫描单个目录，返回 (文件信息列表, 待扫描的子目录列表)"""
+            infos = []
+            subdirs = []
+            child_depth = depth + 1
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        rel_path = prefix + entry.name
+                        try:
+                            if entry.is_dir():
+                                # 与 os.walk 一致：不进入符号链接指向的目录，超出深度限制的文件夹不列出
+                                if entry.is_symlink() or (max_depth is not None and child_depth >= max_depth):
+                                    continue
+
+                                stat = entry.stat()
+                                infos.append(FileInfo(
+                                    path=rel_path,
+                                    size=0,
+                                    modified_time=format_mtime(stat.st_mtime),
+                                    file_type="directory"
+                                ))
+                                subdirs.append((entry.path, rel_path + '/', child_depth))
+                                continue
+
+                            # 扩展名过滤
+                            if ext_filter and not entry.name.endswith(ext_filter):
+                                continue
+
+                            stat = entry.stat()
+                            infos.append(FileInfo(
+                                path=rel_path,
+                                size=stat.st_size,
+                                modified_time=format_mtime(stat.st_mtime),
+                                file_type="file"
+                            ))
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            return infos, subdirs
+
+        # 使用 os.scandir 遍历：目录项自带类型信息，stat 结果在部分平台上也无需额外系统调用
+        if max_depth is not None and max_depth <= 0:
+            return file_list
+
+        root = (self.root_path, '', 0)
+        if max_depth is not None and max_depth <= self.PARALLEL_MIN_DEPTH:
+            # 层级很浅时线程调度的开销大于收益，直接在当前线程遍历
+            pending = [root]
+            while pending:
+                infos, subdirs = scan_directory(*pending.pop())
+                file_list.extend(infos)
+                pending.extend(subdirs)
+            return file_list
+
+        # 遍历以 I/O 等待为主（readdir/stat），多个目录并行扫描，子目录作为新任务继续提交
+        with ThreadPoolExecutor(max_workers=self.SCAN_WORKERS) as executor:
+            running = {executor.submit(scan_directory, *root)}
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    infos, subdirs = future.result()
+                    file_list.extend(infos)
+                    running.update(executor.submit(scan_directory, *subdir) for subdir in subdirs)
 
         return file_list
 
@@ -1150,11 +1477,61 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
             revision: 分支或标签，默认为 "main"
             token: Hugging Face 访问令牌（可选）
         """
+        # huggingface_hub 导入较慢，推迟到真正创建控件时
+        from huggingface_hub import HfApi
+
         self.repo_id = repo_id
         self.revision = revision
+        self.token = token
         self.api = HfApi(token=token)
+        self._info_cache: Dict[bool, Any] = {}  # files_metadata -> 仓库信息，简单/详细模式共用
+        self._basic_file_infos: Optional[List[FileInfo]] = None  # 由简单列表构建的基本文件信息
+        self._detail_cache_time: Dict[tuple, float] = {}  # 缓存键 -> 写入时间（time.monotonic）
         super().__init__(selection_mode=selection_mode, **kwargs)
 
+    def _detail_cache_key(self, params: Dict[str, Any]) -> Optional[tuple]:
+        # 不同令牌可见的文件可能不同（私有/受限仓库），令牌也作为键的一部分
+        key = super()._detail_cache_key(params)
+        return None if key is None else (self.repo_id, self.revision, self.token) + key
+
+    def _is_detail_cache_expired(self, key: Optional[tuple]) -> bool:
+        if _COMMIT_SHA_RE.fullmatch(self.revision):
+            return False
+        return time.monotonic() - self._detail_cache_time.get(key, 0.0) > _HF_DETAIL_CACHE_TTL
+
+    def load_data(self, force_refresh: bool = False, **params):
+        if not self._is_loading:
+            key = self._detail_cache_key(params)
+            if force_refresh or self._is_detail_cache_expired(key):
+                self._detail_cache.pop(key, None)
+                self._info_cache.clear()
+                self._basic_file_infos = None
+        super().load_data(force_refresh=force_refresh, **params)
+
+    def _on_detailed_data_loaded(self, result):
+        key = self._detail_cache_key(self._current_params)
+        if key is not None:
+            self._detail_cache_time[key] = time.monotonic()
+        super()._on_detailed_data_loaded(result)
+
+    def _get_repo_info(self, files_metadata: bool):
+        """
+        获取仓库信息，同一实例内只请求一次
+
+        已有带元数据的结果时，不带元数据的请求直接复用它
+        """
+        repo_info = self._info_cache.get(files_metadata)
+        if repo_info is None and not files_metadata:
+            repo_info = self._info_cache.get(True)
+        if repo_info is None:
+            repo_info = self.api.model_info(
+                repo_id=self.repo_id,
+                revision=self.revision,
+                files_metadata=files_metadata
+            )
+            self._info_cache[files_metadata] = repo_info
+        return repo_info
+
     def get_simple_file_list(self) -> List[str]:
         """
         获取简单文件路径列表（快速获取）
@@ -1166,11 +1543,7 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
         """
         try:
             # 快速获取文件列表，不包含详细元数据
-            repo_info = self.api.model_info(
-                repo_id=self.repo_id,
-                revision=self.revision,
-                files_metadata=False
-            )
+            repo_info = self._get_repo_info(files_metadata=False)
 
             file_paths = []
             if hasattr(repo_info, 'siblings') and repo_info.siblings:
@@ -1194,20 +1567,15 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
 
         try:
             # 获取包含详细元数据的仓库信息
-            repo_info = self.api.model_info(
-                repo_id=self.repo_id,
-                revision=self.revision,
-                files_metadata=True
-            )
+            repo_info = self._get_repo_info(files_metadata=True)
 
-            detailed_info = []
-            if hasattr(repo_info, 'siblings') and repo_info.siblings:
-                for sibling in repo_info.siblings:
-                    file_info = self._convert_sibling_to_file_info(sibling)
-                    if file_info:
-                        detailed_info.append(file_info)
+            siblings = getattr(repo_info, 'siblings', None)
+            if not siblings:
+                return []
 
-            return detailed_info
+            # 大仓库可能有上万个文件，用 map + 推导式减少逐项的循环开销
+            return [file_info for file_info in map(self._convert_sibling_to_file_info, siblings)
+                    if file_info is not None]
 
         except Exception as e:
             print(f"获取详细文件信息失败: {e}")
@@ -1226,16 +1594,25 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
         """
         try:
             # 获取基本信息
-            path = getattr(sibling, 'rfilename', '')
+            try:
+                path = sibling.rfilename
+            except AttributeError:
+                return None
             if not path:
                 return None
 
-            # 文件大小
-            size = getattr(sibling, 'size', 0)
+            # 可选字段：RepoSibling 是普通 dataclass，直接从实例字典读取
+            fields = getattr(sibling, '__dict__', None)
+            if fields is not None:
+                size = fields.get('size') or 0
+                lfs = fields.get('lfs')
+            else:
+                size = getattr(sibling, 'size', 0) or 0
+                lfs = getattr(sibling, 'lfs', None)
 
             # 如果有 LFS 信息，使用 LFS 的大小
-            if hasattr(sibling, 'lfs') and sibling.lfs:
-                lfs_size = getattr(sibling.lfs, 'size', 0)
+            if lfs:
+                lfs_size = getattr(lfs, 'size', 0)
                 if lfs_size > 0:
                     size = lfs_size
 
@@ -1270,28 +1647,11 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
         Returns:
             文件类型描述
         """
-        _, ext = os.path.splitext(path.lower())
-
-        type_mapping = {
-            '.py': 'Python脚本',
-            '.json': 'JSON配置',
-            '.txt': '文本文件',
-            '.md': 'Markdown文档',
-            '.yml': 'YAML配置',
-            '.yaml': 'YAML配置',
-            '.bin': '二进制文件',
-            '.safetensors': 'SafeTensors模型',
-            '.onnx': 'ONNX模型',
-            '.pt': 'PyTorch模型',
-            '.pth': 'PyTorch模型',
-            '.h5': 'HDF5模型',
-            '.pkl': 'Pickle文件',
-            '.gitattributes': 'Git属性',
-            '.gitignore': 'Git忽略',
-            '': '无扩展名文件'
-        }
-
-        return type_mapping.get(ext, f'{ext.upper()}文件' if ext else '未知类型')
+        # 与 os.path.splitext 一致：只看最后一段，忽略文件名开头的点
+        name = path.rpartition('/')[2].lstrip('.')
+        ext = '.' + name.rpartition('.')[2].lower() if '.' in name else ''
+
+        return _FILE_TYPE_MAPPING.get(ext, f'{ext.upper()}文件' if ext else '未知类型')
 
     def _get_modified_time(self, sibling) -> str:
         """
@@ -1305,14 +1665,14 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
         """
         # Hugging Face API 通常不提供文件修改时间
         # 可以尝试从其他字段获取，或者返回默认值
-        if hasattr(sibling, 'last_modified'):
+        last_modified = getattr(sibling, 'last_modified', None)
+        if last_modified is not None:
             try:
                 # 如果有修改时间字段，进行格式化
-                last_modified = sibling.last_modified
                 if isinstance(last_modified, str):
                     return last_modified
                 elif hasattr(last_modified, 'strftime'):
-                    return last_modified.strftime('%Y-%m-%d %H:%M:%S')
+                    return last_modified.strftime(_TIME_FORMAT)
             except:
                 pass
 
@@ -1326,6 +1686,9 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
         Returns:
             基本文件信息列表
         """
+        if self._basic_file_infos is not None:
+            return self._basic_file_infos
+
         simple_list = self.get_simple_file_list()
         basic_info = []
 
@@ -1339,6 +1702,8 @@ class HuggingfaceFileTreeWidget(FileTreeWidget):
             )
             basic_info.append(file_info)
 
+        if basic_info:
+            self._basic_file_infos = basic_info
         return basic_info
 
 
@@ -1,14 +1,32 @@
 import os
-import requests
+import socket
 import re
 from urllib.parse import urlparse
-from typing import Dict
+from typing import Dict, Optional
+from PyQt6.QtCore import QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QIntValidator
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QWidget,
     QLabel, QLineEdit, QPushButton, QGroupBox,
-    QCheckBox, QSpinBox, QComboBox, QMessageBox
+    QCheckBox, QComboBox, QMessageBox
 )
 
+# 深度测试访问的地址：只发 HEAD 请求看状态码，该地址被屏蔽时可改为其他可达的地址
+PROXY_TEST_URL = 'https://httpbin.org/ip'
+
+# 深度测试的连接/读取超时（秒）：代理无法连接时尽快失败，不必等满整个读取时间
+CONNECT_TIMEOUT = 3
+READ_TIMEOUT = 5
+
+# 支持的代理协议
+_ALLOWED_SCHEMES = frozenset({"http", "https", "socks5"})
+
+# 代理类型下拉框的选项：(显示文本, URL 协议)，按下拉框索引取协议
+_PROXY_TYPES = (("HTTP", "http"), ("HTTPS", "https"), ("SOCKS5", "socks5"))
+
+# 主机名校验：支持域名或 IPv4
+_HOSTNAME_RE = re.compile(r"^([a-zA-Z0-9.-]+|\d{1,3}(\.\d{1,3}){3})$")
+
 
 def is_well_formed_proxy_url(url: str) -> bool:
     """
@@ -22,45 +40,123 @@ def is_well_formed_proxy_url(url: str) -> bool:
         return False
 
     parsed = urlparse(url)
-    if parsed.scheme not in {"http", "https", "socks5"}:
+    if parsed.scheme not in _ALLOWED_SCHEMES:
+        return False
+
+    # 端口超出 0~65535 时 urlparse 的 port 属性会抛出 ValueError
+    try:
+        port = parsed.port
+    except ValueError:
         return False
 
-    if not parsed.hostname or not parsed.port:
+    if not parsed.hostname or not port:
         return False
 
     # 额外可选：校验主机名和端口范围
-    hostname_pattern = re.compile(
-        r"^([a-zA-Z0-9.-]+|\d{1,3}(\.\d{1,3}){3})$"  # 支持域名或 IPv4
-    )
-    if not hostname_pattern.match(parsed.hostname):
+    if not _HOSTNAME_RE.match(parsed.hostname):
         return False
 
-    if not (0 < parsed.port <= 65535):
+    if not (0 < port <= 65535):
         return False
 
     return True
 
 
-def is_valid_proxy_url(url: str) -> bool:
-    """验证代理 URL 是否可用"""
+def probe_proxy_url(url: str, timeout: float = 2.0) -> bool:
+    """
+    快速探测代理端口是否接受连接，不经过代理访问外部网站。
+    SOCKS5 代理额外发送握手问候，确认对端确实是 SOCKS5 服务。
+    """
+    if not is_well_formed_proxy_url(url):
+        return False
+
+    parsed = urlparse(url)
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port), timeout=timeout) as sock:
+            if parsed.scheme == "socks5":
+                # 版本 5，提供两种认证方式：无认证 / 用户名密码
+                sock.sendall(b"\x05\x02\x00\x02")
+                reply = sock.recv(2)
+                return len(reply) == 2 and reply[0] == 0x05 and reply[1] in (0x00, 0x02)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def is_valid_proxy_url(url: str, session: Optional["requests.Session"] = None) -> bool:
+    """验证代理 URL 是否可用（传入 session 时复用其连接池）"""
+    # requests 导入较慢，只在真正测试时导入
+    import requests
+
     try:
         proxies = {'http': url, 'https': url}
-        response = requests.get('https://httpbin.org/ip', proxies=proxies, timeout=5)
+        head = session.head if session is not None else requests.head
+        response = head(PROXY_TEST_URL, proxies=proxies, allow_redirects=False,
+                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         return response.status_code == 200
     except Exception:
         return False
 
 
+class ProxyTestSignals(QObject):
+    """代理测试信号"""
+    finished = pyqtSignal(bool, str)  # 是否成功, 提示信息
+
+
+class ProxyTestWorker(QRunnable):
+    """在线程池中测试代理，避免阻塞界面"""
+
+    def __init__(self, proxy_url: str, deep: bool = False, session: Optional["requests.Session"] = None):
+        super().__init__()
+        self.proxy_url = proxy_url
+        self.deep = deep
+        self.session = session
+        self.signals = ProxyTestSignals()
+
+    def run(self):
+        if self.deep:
+            # 先做一次廉价的端口探测，代理端口不可达时无需再发 HTTPS 请求
+            if not probe_proxy_url(self.proxy_url, timeout=1.0):
+                ok, message = False, "代理端口不可达，请检查地址和端口"
+            else:
+                ok = is_valid_proxy_url(self.proxy_url, self.session)
+                message = "代理连接成功！" if ok else "代理连接失败，请检查配置"
+        else:
+            ok = probe_proxy_url(self.proxy_url)
+            message = "代理端口可以连接！" if ok else "无法连接到代理端口，请检查地址和端口"
+        self.signals.finished.emit(ok, message)
+
+
 class ProxyConfigWidget(QWidget):
     """代理配置组件"""
 
+    # 配置变化时发出（输入停顿后合并为一次），使用方缓存该字典即可，无需反复调用 get_config
+    configChanged = pyqtSignal(dict)
+
+    # 输入停止多久后再应用代理配置（毫秒）
+    APPLY_DELAY_MS = 150
+
     def __init__(self):
         super().__init__()
+        self._applied_proxy_url: Optional[str] = None  # 最近一次写入环境变量的代理地址，空串表示已清除
+        self._emitted_config: Optional[Dict] = None  # 最近一次通过 configChanged 发出的配置
+        self._test_worker: Optional[ProxyTestWorker] = None
+
+        # 代理地址缓存：任一输入变化时标记失效，下次读取时重新拼接
+        self._cached_proxy_url = ""
+        self._proxy_url_dirty = True
+
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout()
 
+        # 连续输入时合并为一次更新
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.APPLY_DELAY_MS)
+        self._debounce.timeout.connect(self._apply_proxy_config)
+
         # 启用代理
         self.proxy_enabled = QCheckBox("启用代理")
         self.proxy_enabled.toggled.connect(self.on_proxy_enabled_changed)
@@ -74,7 +170,9 @@ class ProxyConfigWidget(QWidget):
         type_layout = QHBoxLayout()
         type_layout.addWidget(QLabel("代理类型:"))
         self.proxy_type = QComboBox()
-        self.proxy_type.addItems(["HTTP", "HTTPS", "SOCKS5"])
+        self.proxy_type.addItems([label for label, _ in _PROXY_TYPES])
+        self._protocol = _PROXY_TYPES[0][1]
+        self.proxy_type.currentIndexChanged.connect(self._on_proxy_type_changed)
         self.proxy_type.currentIndexChanged.connect(self.on_proxy_config_changed)
         type_layout.addWidget(self.proxy_type)
         proxy_layout.addLayout(type_layout)
@@ -87,10 +185,11 @@ class ProxyConfigWidget(QWidget):
         self.proxy_host.textChanged.connect(self.on_proxy_config_changed)
         addr_layout.addWidget(self.proxy_host)
         addr_layout.addWidget(QLabel("端口:"))
-        self.proxy_port = QSpinBox()
-        self.proxy_port.setRange(1, 65535)
-        self.proxy_port.setValue(7890)
-        self.proxy_port.valueChanged.connect(self.on_proxy_config_changed)
+        # 端口很少修改，用带校验的输入框即可，不需要 QSpinBox 的调节按钮
+        self.proxy_port = QLineEdit("7890")
+        self.proxy_port.setValidator(QIntValidator(1, 65535, self))
+        self.proxy_port.setMaxLength(5)
+        self.proxy_port.textChanged.connect(self.on_proxy_config_changed)
         addr_layout.addWidget(self.proxy_port)
         proxy_layout.addLayout(addr_layout)
 
@@ -113,10 +212,15 @@ class ProxyConfigWidget(QWidget):
         user_layout.addWidget(self.password)
         proxy_layout.addLayout(user_layout)
 
-        # 测试按钮
+        # 测试按钮：快速测试只检查代理端口，深度测试经代理访问外部网站
+        test_layout = QHBoxLayout()
         self.test_btn = QPushButton("测试连接")
         self.test_btn.clicked.connect(self.test_proxy)
-        proxy_layout.addWidget(self.test_btn)
+        test_layout.addWidget(self.test_btn)
+        self.deep_test_btn = QPushButton("深度测试")
+        self.deep_test_btn.clicked.connect(self.deep_test_proxy)
+        test_layout.addWidget(self.deep_test_btn)
+        proxy_layout.addLayout(test_layout)
 
         self.proxy_group.setLayout(proxy_layout)
         layout.addWidget(self.proxy_group)
@@ -127,40 +231,98 @@ class ProxyConfigWidget(QWidget):
         self.proxy_group.setEnabled(False)
 
     def on_proxy_enabled_changed(self, enabled: bool):
+        self._proxy_url_dirty = True
         self.proxy_group.setEnabled(enabled)
-        self.on_proxy_config_changed()  # 立即触发一次检查
+        # 开关切换不是连续输入，立即应用
+        self._debounce.stop()
+        self._apply_proxy_config()
+
+    def _on_proxy_type_changed(self, index: int):
+        if 0 <= index < len(_PROXY_TYPES):
+            self._protocol = _PROXY_TYPES[index][1]
 
     def on_proxy_config_changed(self):
-        if not self.proxy_enabled.isChecked():
-            self.clear_proxy_env()
-            return
+        self._proxy_url_dirty = True
+        self._debounce.start()
+
+    def flush_pending_config(self):
+        """立即应用尚在等待中的代理配置"""
+        if self._debounce.isActive():
+            self._debounce.stop()
+            self._apply_proxy_config()
+
+    def _apply_proxy_config(self):
+        self._emit_config()
 
         proxy_url = self.get_proxy_url()
-        if proxy_url and is_well_formed_proxy_url(proxy_url):
+        if not (proxy_url and is_well_formed_proxy_url(proxy_url)):
+            proxy_url = ""
+
+        # 与上次应用的结果相同时不再改写环境变量
+        if proxy_url == self._applied_proxy_url:
+            return
+        self._applied_proxy_url = proxy_url
+
+        if proxy_url:
             self.set_proxy_env(proxy_url)
         else:
             self.clear_proxy_env()
 
     def test_proxy(self):
+        self._start_proxy_test(deep=False)
+
+    def deep_test_proxy(self):
+        self._start_proxy_test(deep=True)
+
+    def _start_proxy_test(self, deep: bool):
+        # 已有测试在进行时忽略重复请求（按钮已禁用，这里同时拦住代码直接调用）
+        if self._test_worker is not None:
+            return
+
         proxy_url = self.get_proxy_url()
         if not proxy_url:
             QMessageBox.warning(self, "测试结果", "请填写完整的代理地址")
             return
 
-        if is_valid_proxy_url(proxy_url):
-            QMessageBox.information(self, "测试结果", "代理连接成功！")
+        self.test_btn.setEnabled(False)
+        self.deep_test_btn.setEnabled(False)
+
+        worker = ProxyTestWorker(proxy_url, deep, self._get_session() if deep else None)
+        worker.signals.finished.connect(self._on_proxy_test_finished)
+        self._test_worker = worker  # 保持信号对象存活，直到结果返回
+        QThreadPool.globalInstance().start(worker)
+
+    @staticmethod
+    def _get_session() -> "requests.Session":
+        """深度测试使用不重试的独立会话，失败时尽快返回；requests 在首次深度测试时才导入"""
+        from net.session import get_probe_session
+        return get_probe_session()
+
+    def _on_proxy_test_finished(self, ok: bool, message: str):
+        self._test_worker = None
+        self.test_btn.setEnabled(True)
+        self.deep_test_btn.setEnabled(True)
+
+        if ok:
+            QMessageBox.information(self, "测试结果", message)
         else:
-            QMessageBox.critical(self, "测试结果", "代理连接失败，请检查配置")
+            QMessageBox.critical(self, "测试结果", message)
 
     def get_proxy_url(self) -> str:
+        if self._proxy_url_dirty:
+            self._cached_proxy_url = self._build_proxy_url()
+            self._proxy_url_dirty = False
+        return self._cached_proxy_url
+
+    def _build_proxy_url(self) -> str:
         if not self.proxy_enabled.isChecked():
             return ""
 
-        protocol = self.proxy_type.currentText().lower()
+        protocol = self._protocol
         host = self.proxy_host.text().strip()
-        port = self.proxy_port.value()
+        port = self.get_proxy_port()
 
-        if not host:
+        if not host or not port:
             return ""
 
         if self.auth_enabled.isChecked():
@@ -171,6 +333,15 @@ class ProxyConfigWidget(QWidget):
 
         return f"{protocol}://{host}:{port}"
 
+    def get_proxy_port(self) -> int:
+        """代理端口，未填写或超出 1~65535 时返回 0"""
+        # QIntValidator 允许输入 70000 这类中间状态，不能直接信任文本
+        text = self.proxy_port.text()
+        if not text.isdigit():
+            return 0
+        port = int(text)
+        return port if self.proxy_port.hasAcceptableInput() and 0 < port <= 65535 else 0
+
     def set_proxy_env(self, proxy_url: str):
         os.environ["http_proxy"] = proxy_url
         os.environ["https_proxy"] = proxy_url
@@ -179,10 +350,20 @@ class ProxyConfigWidget(QWidget):
         os.environ.pop("http_proxy", None)
         os.environ.pop("https_proxy", None)
 
-    def get_config(self) -> Dict:
+    def _emit_config(self):
+        config = self._build_config()
+        if config != self._emitted_config:
+            self._emitted_config = config
+            self.configChanged.emit(config)
+
+    def _build_config(self) -> Dict:
         return {
             'enabled': self.proxy_enabled.isChecked(),
             'proxy_host': self.proxy_host.text().strip(),
-            'proxy_port': self.proxy_port.value(),
+            'proxy_port': self.get_proxy_port(),
             'url': self.get_proxy_url(),
         }
+
+    def get_config(self) -> Dict:
+        self.flush_pending_config()
+        return self._build_config()
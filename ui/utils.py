@@ -1,20 +1,45 @@
+from typing import Optional
+
 from PyQt6.QtGui import QPalette, QColor
 from PyQt6.QtWidgets import QApplication
 
+_ROLE = QPalette.ColorRole
 
-def set_black_ui(app: QApplication):
+# 深色主题配色 (角色, RGB)
+_DARK_PALETTE_COLORS = (
+    (_ROLE.Window, (53, 53, 53)),
+    (_ROLE.WindowText, (255, 255, 255)),
+    (_ROLE.Base, (25, 25, 25)),
+    (_ROLE.AlternateBase, (53, 53, 53)),
+    (_ROLE.ToolTipBase, (0, 0, 0)),
+    (_ROLE.ToolTipText, (255, 255, 255)),
+    (_ROLE.Text, (255, 255, 255)),
+    (_ROLE.Button, (53, 53, 53)),
+    (_ROLE.ButtonText, (255, 255, 255)),
+    (_ROLE.BrightText, (255, 0, 0)),
+    (_ROLE.Link, (42, 130, 218)),
+    (_ROLE.Highlight, (42, 130, 218)),
+    (_ROLE.HighlightedText, (0, 0, 0)),
+)
+
+# QPalette 需要在 QApplication 创建后构建，首次使用时生成并缓存
+_DARK_PALETTE: Optional[QPalette] = None
+
+
+def _build_dark_palette() -> QPalette:
     palette = QPalette()
-    palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.WindowText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Base, QColor(25, 25, 25))
-    palette.setColor(QPalette.ColorRole.AlternateBase, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(0, 0, 0))
-    palette.setColor(QPalette.ColorRole.ToolTipText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Text, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ButtonText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.BrightText, QColor(255, 0, 0))
-    palette.setColor(QPalette.ColorRole.Link, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.Highlight, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.HighlightedText, QColor(0, 0, 0))
-    app.setPalette(palette)
\ No newline at end of file
+    for role, rgb in _DARK_PALETTE_COLORS:
+        palette.setColor(role, QColor(*rgb))
+    return palette
+
+
+def get_dark_palette() -> QPalette:
+    """获取深色主题调色板（只构建一次）"""
+    global _DARK_PALETTE
+    if _DARK_PALETTE is None:
+        _DARK_PALETTE = _build_dark_palette()
+    return _DARK_PALETTE
+
+
+def set_black_ui(app: QApplication):
+    app.setPalette(get_dark_palette())